@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from iconsdk.icon_service import IconService  # noqa: E402
+
+import util  # noqa: E402
+from benchmarks.mock_node import MockNode  # noqa: E402
+from util import use_output  # noqa: E402
+from util.command import parse_args  # noqa: E402
+from util.metrics import Metrics  # noqa: E402
+from util.output import Output  # noqa: E402
+from util.provider import RetryPolicy, SessionProvider  # noqa: E402
+from util.txhandler import TxHandler  # noqa: E402
+
+ADDRESS = MockNode.address('hx', 0xabc)
+PREP = MockNode.prep_address(0)
+START = MockNode.HEIGHT - 30 * MockNode.PERIOD
+
+# name -> command line, run against the mock node
+CASES = {
+    'prep --get-preps': ['prep', '--get-preps'],
+    'delegate': ['delegate', '--address', ADDRESS],
+    'audit --dump-java': ['audit', '--dump-java'],
+    'inspect --bisect': ['inspect', '--bisect', f'{MockNode.HEIGHT - 2_000_000},{MockNode.HEIGHT}',
+                         '--address', PREP],
+    'info --trend': ['info', '--trend', f'total={START}'],
+}
+
+
+class Commands(object):
+    pass
+
+
+class TracedProvider(SessionProvider):
+
+    # the memory allocated and kept by the requests of each method (e.g. the parsed responses) while tracing,
+    # the concurrent requests of different methods may count each other's allocations
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._memory_lock = threading.Lock()
+        self.memory = {}
+
+    def _post(self, url, data):
+        before = tracemalloc.get_traced_memory()[0]
+        result = super()._post(url, data)
+        allocated = max(0, tracemalloc.get_traced_memory()[0] - before)
+        method = Metrics.method_name(data)
+        with self._memory_lock:
+            self.memory[method] = self.memory.get(method, 0) + allocated
+        return result
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_mock(args, port):
+    cmd = [sys.executable, os.path.join(BENCH_DIR, 'mock_node.py'), '--port', str(port),
+           '--latency', str(args.latency), '--jitter', str(args.jitter),
+           '--preps', str(args.preps), '--contracts', str(args.contracts)]
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            requests.get(f'http://127.0.0.1:{port}/health', timeout=1)
+            return process
+        except requests.exceptions.ConnectionError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    sys.exit('Error: failed to start the mock node')
+
+
+def run_case(argv, url, trace=False):
+    # the command runs in this process with a fresh handler, so the caches are cold on every run
+    provider = TracedProvider(url, policy=RetryPolicy(0))
+    tx_handler = TxHandler(IconService(provider), 0x3, provider)
+    cmd = Commands()
+    args = parse_args(cmd, ['-e', 'local'] + argv)
+    args.txhandler = tx_handler
+    if trace:
+        tracemalloc.start()
+    start, cpu = time.perf_counter(), time.process_time()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull), use_output(Output('text')):
+        try:
+            getattr(cmd, args.command)(args)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise RuntimeError(f'exit status {e.code}')
+    result = {
+        'wall': time.perf_counter() - start,
+        'cpu': time.process_time() - cpu,
+    }
+    if trace:
+        result['peak'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    stages = tx_handler.metrics.snapshot()
+    result['requests'] = sum(s.requests for _, s in stages)
+    result['calls'] = sum(s.calls for _, s in stages)
+    result['received'] = sum(s.received for _, s in stages)
+    result['stages'] = dict((method, {'requests': s.requests, 'calls': s.calls, 'time': s.latency.sum,
+                                      'memory': provider.memory.get(method, 0) if trace else None})
+                            for method, s in stages)
+    return result
+
+
+def bench(name, url, repeat):
+    runs = [run_case(CASES[name], url) for _ in range(repeat)]
+    # the memory is measured on a separate run, tracing slows down the others
+    traced = run_case(CASES[name], url, trace=True)
+    wall = statistics.median(r['wall'] for r in runs)
+    return {
+        'wall': wall,
+        'cpu': statistics.median(r['cpu'] for r in runs),
+        'peak': traced['peak'],
+        'requests': runs[-1]['requests'],
+        'calls': runs[-1]['calls'],
+        'received': runs[-1]['received'],
+        'throughput': runs[-1]['calls'] / wall if wall > 0 else 0,
+        'stages': dict((method, {**s, 'memory': traced['stages'].get(method, {}).get('memory')})
+                       for method, s in runs[-1]['stages'].items()),
+    }
+
+
+def print_results(results, verbose):
+    print(f"{'case':24s} {'wall(ms)':>9s} {'cpu(ms)':>9s} {'peak(KB)':>9s} {'reqs':>6s} {'calls':>6s} "
+          f"{'recv(KB)':>9s} {'calls/s':>8s}")
+    for name, r in results.items():
+        print(f"{name:24s} {r['wall'] * 1000:9.1f} {r['cpu'] * 1000:9.1f} {r['peak'] / 1024:9.1f} {r['requests']:6d} "
+              f"{r['calls']:6d} {r['received'] / 1024:9.1f} {r['throughput']:8.1f}")
+        if verbose:
+            for method, s in sorted(r['stages'].items()):
+                memory = f"{s['memory'] / 1024:.1f}KB" if s.get('memory') is not None else '-'
+                print(f"    {method:28s} reqs={s['requests']:<5d} calls={s['calls']:<6d} "
+                      f"time={s['time'] * 1000:.1f}ms mem={memory}")
+
+
+def compare(results, baseline, threshold):
+    # slower beyond the threshold, or more round trips than the baseline
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if r['wall'] > base['wall'] * (1 + threshold):
+            regressions.append(f"{name}: wall {base['wall'] * 1000:.1f}ms -> {r['wall'] * 1000:.1f}ms")
+        if r['requests'] > base['requests']:
+            regressions.append(f"{name}: requests {base['requests']} -> {r['requests']}")
+        if r['peak'] > base['peak'] * (1 + threshold):
+            regressions.append(f"{name}: peak {base['peak'] // 1024}KB -> {r['peak'] // 1024}KB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the commands against a local mock node')
+    parser.add_argument('cases', nargs='*', metavar='CASE', help=f'cases to run (default: all of {list(CASES)})')
+    parser.add_argument('--latency', type=float, default=0.01, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.005, help='random seconds added up to this')
+    parser.add_argument('--preps', type=int, default=150, help='number of P-Reps in the mock node')
+    parser.add_argument('--contracts', type=int, default=300, help='number of contracts in the mock tracker')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs of each case')
+    parser.add_argument('--save', type=str, metavar='FILE', help='write the results to the file')
+    parser.add_argument('--baseline', type=str, metavar='FILE', help='compare with the saved results')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown against the baseline')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show the requests of each stage')
+    args = parser.parse_args()
+
+    names = args.cases if args.cases else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        sys.exit(f'Error: unknown cases: {unknown}')
+    port = free_port()
+    process = start_mock(args, port)
+    url = f'http://127.0.0.1:{port}'
+    # the mock node serves the tracker API as well, in place of the one of the local nid
+    util.TRACKER_PREFIXES[0x3] = url
+    print(f'>>> mock node at {url}, latency={args.latency}s, jitter={args.jitter}s, repeat={args.repeat}')
+    try:
+        results = dict((name, bench(name, url, args.repeat)) for name in names)
+    finally:
+        process.terminate()
+        process.wait()
+    print_results(results, args.verbose)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print('>>> Regression:', line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,613 @@
+#!/usr/bin/env python
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from bisect import bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CHAIN_ADDRESS = "cx0000000000000000000000000000000000000000"
+GOV_ADDRESS = "cx0000000000000000000000000000000000000001"
+ICX = 10 ** 18
+
+
+class MockError(Exception):
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class AccountState(object):
+
+    def __init__(self, balance=0, stake=0, unstakes=None, delegations=None, bonds=None, claimed=0):
+        self.balance = balance
+        self.stake = stake
+        self.unstakes = unstakes if unstakes else []  # (amount, target height)
+        self.delegations = delegations if delegations else {}
+        self.bonds = bonds if bonds else {}
+        self.claimed = claimed  # the height of the last claim
+
+    def copy(self):
+        return AccountState(self.balance, self.stake, list(self.unstakes), dict(self.delegations), dict(self.bonds),
+                            self.claimed)
+
+    def at(self, height):
+        # the unstaked amounts come back to the balance at the target height
+        state = self.copy()
+        state.balance += sum(amount for amount, target in self.unstakes if target <= height)
+        state.unstakes = [(amount, target) for amount, target in self.unstakes if target > height]
+        return state
+
+    @property
+    def used(self):
+        return sum(self.delegations.values()) + sum(self.bonds.values())
+
+
+class MockNode(object):
+    HEIGHT = 80_000_000
+    PERIOD = 43200
+    CHANGE_HEIGHT = 79_123_457  # the delegations of all the P-Reps grow here, for the bisect
+    BLOCK_TIME = 2_000_000  # in microseconds
+    STEP_PRICE = 12_500_000_000
+    STEP_USED = 100_000
+    UNSTAKE_PERIOD = 20 * 43200
+    PREP_FEE = 2000 * ICX
+    PREP_BASE = 0xf << 156
+    REWARD_RATE = 6  # percent of the delegation a year
+    BLOCKS_PER_YEAR = 15_768_000
+
+    # the accounts hx{i:040x} (i < accounts) have the state derived from the hash of the address,
+    # so millions of them take no memory; only the accounts changed by the transactions are kept, by height
+    def __init__(self, preps=150, contracts=300, accounts=1_000_000, seed=0, funded=(), block_time=0):
+        self._lock = threading.RLock()
+        self._accounts = accounts
+        self._seed = seed
+        self._funded = set(funded)
+        self._block_time = block_time
+        self._started = time.monotonic()
+        self._height = self.HEIGHT
+        self._history = {}
+        self._blocks = {}
+        self._txs = {}
+        self._delta = {}
+        self.preps = [self._prep(i) for i in range(preps)]
+        self._prep_map = dict((p['address'], p) for p in self.preps)
+        self.contracts = [self._contract(i) for i in range(contracts)]
+
+    @staticmethod
+    def address(prefix, i):
+        return f'{prefix}{i:040x}'
+
+    @classmethod
+    def prep_address(cls, i):
+        return cls.address('hx', cls.PREP_BASE + i)
+
+    def _prep(self, i):
+        return {
+            'address': self.prep_address(i),
+            'name': f'P-Rep {i}',
+            'country': 'KOR',
+            'city': 'Seoul',
+            'email': f'prep{i}@example.com',
+            'website': f'https://prep{i}.example.com',
+            'details': f'https://prep{i}.example.com/details',
+            'p2pEndpoint': f'prep{i}.example.com:7100',
+            'grade': '0x0' if i < 22 else '0x1' if i < 100 else '0x2',
+            'status': '0x0',
+            'penalty': '0x0',
+            'delegated': hex((2_000_000 - i * 10_000 if i < 190 else 10_000) * ICX),
+            'bonded': hex((100_000 + i * 100) * ICX),
+            'commissionRate': hex(100 * (i % 10 + 1)),
+            'jailFlags': '0x0',
+            'hasPublicKey': '0x1',
+            'lastHeight': hex(self.HEIGHT - i),
+            'totalBlocks': hex(1_000_000 + i),
+            'validatedBlocks': hex(999_000 + i),
+        }
+
+    def _contract(self, i):
+        return {
+            'address': self.address('cx', 0x2000 + i),
+            'contractAddr': self.address('cx', 0x2000 + i),
+            'contractName': f'Contract {i}',
+            'verifiedDate': f'{2020 + i % 5}-{i % 12 + 1:02d}-{i % 28 + 1:02d}T00:00:00',
+            'createTx': f'0x{0x3000 + i:064x}',
+            'version': '0x1',
+            'status': 'Active',
+        }
+
+    @property
+    def height(self):
+        with self._lock:
+            if self._block_time:
+                elapsed = int((time.monotonic() - self._started) / self._block_time)
+                self._height = max(self._height, self.HEIGHT + elapsed)
+            return self._height
+
+    def _random(self, address, count):
+        digest = hashlib.blake2b(f'{self._seed}:{address}'.encode(), digest_size=8 * count).digest()
+        return [int.from_bytes(digest[i * 8:(i + 1) * 8], 'big') for i in range(count)]
+
+    def _base(self, address):
+        if address in self._funded:
+            return AccountState(balance=10 ** 9 * ICX, claimed=self.HEIGHT)
+        if address in self._prep_map:
+            return AccountState(balance=10_000 * ICX, claimed=self.HEIGHT)
+        index = int(address[2:], 16) if address.startswith('hx') else self._accounts
+        if index >= self._accounts or len(self.preps) == 0:
+            return AccountState()
+        r = self._random(address, 5)
+        stake = r[1] % 50_000 * ICX
+        delegations = {}
+        for j in range(r[2] % 4):
+            delegations[self.preps[(r[3] + j * 7) % len(self.preps)]['address']] = stake // 4
+        return AccountState(balance=r[0] % 100_000 * ICX + r[0] % ICX, stake=stake, delegations=delegations,
+                            claimed=self.HEIGHT - r[4] % 100_000)
+
+    def state(self, address, height=None):
+        with self._lock:
+            history = self._history.get(address)
+            if history is not None:
+                heights, states = history
+                i = len(states) - 1 if height is None else bisect_right(heights, height) - 1
+                if i >= 0:
+                    return states[i]
+            return self._base(address)
+
+    def _update(self, address, state, height):
+        heights, states = self._history.setdefault(address, ([], []))
+        if heights and heights[-1] == height:
+            states[-1] = state
+        else:
+            heights.append(height)
+            states.append(state)
+
+    def iscore(self, state, height):
+        per_block = state.used * 1000 * self.REWARD_RATE // 100 // self.BLOCKS_PER_YEAR
+        return per_block * max(0, height - state.claimed)
+
+    def _get_prep(self, address, height):
+        prep = self._prep_map.get(address)
+        if prep is None:
+            raise MockError(-30032, f'NotFound: P-Rep {address}')
+        delegated = int(prep['delegated'], 16) + self._delta.get(address, 0)
+        if height >= self.CHANGE_HEIGHT:
+            delegated += 1000 * ICX
+        bonded = int(prep['bonded'], 16)
+        return dict(prep, delegated=hex(delegated), power=hex(delegated + bonded), blockHeight=hex(height))
+
+    def get_preps(self, params, height):
+        with self._lock:
+            preps = sorted((self._get_prep(p['address'], height) for p in self.preps),
+                           key=lambda p: int(p['power'], 16), reverse=True)
+        start = int(params.get('startRanking', '0x1'), 16)
+        end = int(params.get('endRanking', hex(len(preps))), 16)
+        return {
+            'blockHeight': hex(height),
+            'startRanking': hex(start),
+            'totalDelegated': hex(sum(int(p['delegated'], 16) for p in preps)),
+            'totalStake': hex(2 * 10 ** 8 * ICX),
+            'preps': preps[start - 1:end],
+        }
+
+    def total_supply(self, height):
+        return 800_000_000 * ICX + height * 3 * ICX
+
+    def call(self, to, method, params, height):
+        if to in (CHAIN_ADDRESS, GOV_ADDRESS):
+            return self._call_chain(method, params, height)
+        if to.startswith('cx'):
+            return self._call_token(to, method, params)
+        raise MockError(-32602, f'InvalidParams: not a contract {to}')
+
+    def _call_chain(self, method, params, height):
+        address = params.get('address')
+        if method == 'getStake':
+            state = self.state(address, height).at(height)
+            return {'stake': hex(state.stake), 'unstakes': [
+                {'unstake': hex(amount), 'unstakeBlockHeight': hex(target), 'remainingBlocks': hex(target - height)}
+                for amount, target in state.unstakes]}
+        if method == 'getDelegation':
+            state = self.state(address, height)
+            delegated = sum(state.delegations.values())
+            return {'delegations': [{'address': a, 'value': hex(v)} for a, v in state.delegations.items()],
+                    'totalDelegated': hex(delegated), 'votingPower': hex(state.stake - state.used)}
+        if method == 'getBond':
+            state = self.state(address, height)
+            return {'bonds': [{'address': a, 'value': hex(v)} for a, v in state.bonds.items()],
+                    'totalBonded': hex(sum(state.bonds.values())), 'unbonds': [],
+                    'votingPower': hex(state.stake - state.used)}
+        if method == 'queryIScore':
+            iscore = self.iscore(self.state(address, height), height)
+            return {'blockHeight': hex(height), 'iscore': hex(iscore), 'estimatedICX': hex(iscore // 1000)}
+        if method == 'getPReps':
+            return self.get_preps(params, height)
+        if method == 'getPRep':
+            with self._lock:
+                return self._get_prep(address, height)
+        if method == 'getBonderList':
+            return {'bonderList': [address]}
+        if method == 'getPRepTerm':
+            start = height - height % self.PERIOD
+            return {'blockHeight': hex(height), 'sequence': hex(height // self.PERIOD),
+                    'startBlockHeight': hex(start), 'endBlockHeight': hex(start + self.PERIOD - 1),
+                    'period': hex(self.PERIOD), 'totalSupply': hex(self.total_supply(height)),
+                    'preps': self.get_preps({'endRanking': '0x16'}, height)['preps']}
+        if method == 'getIISSInfo':
+            start = height - height % self.PERIOD
+            return {'blockHeight': hex(height), 'nextCalculation': hex(start + self.PERIOD),
+                    'nextPRepTerm': hex(start + self.PERIOD),
+                    'rcResult': {'iscore': hex(10 ** 30), 'estimatedICX': hex(10 ** 27),
+                                 'startBlockHeight': hex(start - self.PERIOD), 'endBlockHeight': hex(start - 1)},
+                    'variable': {'Iglobal': hex(3 * ICX * self.BLOCKS_PER_YEAR // 12), 'Iprep': '0x1388',
+                                 'Irelay': '0x0', 'Ivoter': '0x1388', 'Iwage': '0x0'}}
+        if method == 'getNetworkInfo':
+            preps = self.get_preps({}, height)
+            return {'mainPReps': '0x16', 'subPReps': hex(max(0, min(100, len(preps['preps'])) - 22)),
+                    'totalStake': preps['totalStake'], 'totalDelegated': preps['totalDelegated'],
+                    'totalBonded': hex(sum(int(p['bonded'], 16) for p in preps['preps'])),
+                    'preps': hex(len(preps['preps'])), 'bondRequirement': '0x5', 'unstakeSlotMax': '0x3e8',
+                    'unbondingPeriodMultiplier': '0x7', 'lockMinMultiplier': '0x5', 'lockMaxMultiplier': '0x14',
+                    'rewardFund': {'Iglobal': hex(3 * ICX * self.BLOCKS_PER_YEAR // 12), 'Iprep': '0x1388',
+                                   'Ivoter': '0x1388'}}
+        if method == 'getScoreStatus':
+            n = int(address[2:], 16)
+            audit_tx = f'0x{n:064x}' if n % 2 == 0 else f'0x{n + 1:064x}'
+            return {'current': {'status': 'active', 'deployTxHash': f'0x{n:064x}', 'auditTxHash': audit_tx},
+                    'owner': self.address('hx', n), 'depositInfo': {'availableDeposit': '0x0'}}
+        if method == 'getVersion':
+            return '0x1'
+        if method == 'getRevision':
+            return '0x18'
+        if method == 'getStepPrice':
+            return hex(self.STEP_PRICE)
+        if method == 'getStepCosts':
+            return {'default': hex(self.STEP_USED), 'input': '0xc8', 'contractCall': '0x61a8'}
+        if method == 'getMaxStepLimit':
+            return hex(2_500_000_000 if params.get('contextType') == 'invoke' else 50_000_000)
+        if method == 'getServiceConfig':
+            return {'auditEnabled': '0x1', 'deployerWhiteListEnabled': '0x0'}
+        raise MockError(-32601, f'MethodNotFound: {method}')
+
+    def _call_token(self, to, method, params):
+        # every other contract is an IRC2 token with the balances derived from the hash
+        if method == 'name':
+            return f'Token {to[-4:]}'
+        if method == 'symbol':
+            return f'T{to[-4:].upper()}'
+        if method == 'decimals':
+            return '0x12'
+        if method == 'totalSupply':
+            return hex(10 ** 9 * ICX)
+        if method == 'balanceOf':
+            return hex(self._random(to + params.get('_owner', ''), 1)[0] % 1_000_000 * ICX)
+        raise MockError(-30001, f'MethodNotFound: {to}.{method}')
+
+    def send_transaction(self, params):
+        tx_hash = '0x' + hashlib.sha3_256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        with self._lock:
+            if tx_hash in self._txs:
+                raise MockError(-31000, f'SystemError: duplicated transaction {tx_hash}')
+            height = self.height + 1
+            self._height = height
+            tx = dict(params, txHash=tx_hash)
+            block = self._blocks.setdefault(height, [])
+            result = self._execute(tx, height)
+            result.update({'txHash': tx_hash, 'txIndex': hex(len(block) + 1), 'blockHeight': hex(height),
+                           'blockHash': f'0x{height:064x}'})
+            block.append(tx)
+            self._txs[tx_hash] = (tx, result)
+        return tx_hash
+
+    def _execute(self, tx, height):
+        sender, to = tx['from'], tx.get('to', '')
+        value = int(tx.get('value', '0x0'), 16)
+        fee = self.STEP_USED * self.STEP_PRICE
+        logs = []
+        state = self.state(sender, height).at(height)
+        failure = None
+        if state.balance < value + fee:
+            failure = 'OutOfBalance'
+        else:
+            state.balance -= value + fee
+            data = tx.get('data') if tx.get('dataType') == 'call' else None
+            if to == CHAIN_ADDRESS and isinstance(data, dict):
+                failure = self._invoke(sender, state, data.get('method'), data.get('params', {}), value, height, logs)
+            elif to == sender:
+                state.balance += value
+            elif to.startswith('hx'):
+                receiver = self.state(to, height).at(height)
+                receiver.balance += value
+                self._update(to, receiver, height)
+        if failure is not None:
+            # the fee is paid anyway
+            state = self.state(sender, height).at(height)
+            state.balance -= min(fee, state.balance)
+        self._update(sender, state, height)
+        result = {'status': '0x1' if failure is None else '0x0', 'to': to, 'stepUsed': hex(self.STEP_USED),
+                  'stepPrice': hex(self.STEP_PRICE), 'cumulativeStepUsed': hex(self.STEP_USED),
+                  'eventLogs': logs if failure is None else [], 'logsBloom': '0x' + '0' * 512}
+        if failure is not None:
+            result['failure'] = {'code': '0x20', 'message': failure}
+        return result
+
+    def _invoke(self, sender, state, method, params, value, height, logs):
+        if method == 'setStake':
+            stake = int(params['value'], 16)
+            if stake < state.used or stake > state.balance + state.stake:
+                return f'InvalidParams: stake {stake}'
+            if stake >= state.stake:
+                state.balance -= stake - state.stake
+            else:
+                state.unstakes.append((state.stake - stake, height + self.UNSTAKE_PERIOD))
+            state.stake = stake
+            logs.append({'scoreAddress': CHAIN_ADDRESS, 'indexed': ['StakeSet(Address,int,int)', sender],
+                         'data': [hex(stake), hex(stake)]})
+        elif method in ('setDelegation', 'setBond'):
+            key = 'delegations' if method == 'setDelegation' else 'bonds'
+            items = dict((d['address'], int(d['value'], 16)) for d in params.get(key, []))
+            if any(address not in self._prep_map for address in items):
+                return f'NotFound: P-Rep in {key}'
+            current = state.delegations if key == 'delegations' else state.bonds
+            if state.used - sum(current.values()) + sum(items.values()) > state.stake:
+                return f'InvalidParams: {key} over the stake'
+            for address, amount in current.items():
+                self._delta[address] = self._delta.get(address, 0) - amount
+            for address, amount in items.items():
+                self._delta[address] = self._delta.get(address, 0) + amount
+            if key == 'delegations':
+                state.delegations = items
+            else:
+                state.bonds = items
+            event = 'DelegationSet(Address,bytes)' if key == 'delegations' else 'BondSet(Address,bytes)'
+            logs.append({'scoreAddress': CHAIN_ADDRESS, 'indexed': [event, sender], 'data': ['0x']})
+        elif method == 'claimIScore':
+            iscore = self.iscore(state, height)
+            state.balance += iscore // 1000
+            state.claimed = height
+            logs.append({'scoreAddress': CHAIN_ADDRESS, 'indexed': ['IScoreClaimedV2(Address,int,int)', sender],
+                         'data': [hex(iscore), hex(iscore // 1000)]})
+        elif method == 'registerPRep':
+            if sender in self._prep_map:
+                return 'InvalidRequest: already registered'
+            if value != self.PREP_FEE:
+                return f'InvalidParams: fee {value}'
+            prep = self._prep(len(self.preps))
+            prep.update(dict((k, params[k]) for k in ('name', 'country', 'city', 'email', 'website', 'details',
+                                                     'p2pEndpoint') if k in params))
+            prep.update({'address': sender, 'grade': '0x2', 'delegated': '0x0', 'bonded': '0x0',
+                         'lastHeight': hex(height)})
+            self.preps.append(prep)
+            self._prep_map[sender] = prep
+            logs.append({'scoreAddress': CHAIN_ADDRESS, 'indexed': ['PRepRegistered(Address)'], 'data': [sender]})
+        elif method not in ('setBonderList', 'requestUnjail', 'acceptScore', 'rejectScore'):
+            return f'MethodNotFound: {method}'
+        return None
+
+    def get_block(self, height):
+        with self._lock:
+            txs = list(self._blocks.get(height, []))
+        timestamp = 1_700_000_000_000_000 + (height - self.HEIGHT) * self.BLOCK_TIME
+        base = {'version': '0x3', 'timestamp': hex(timestamp), 'dataType': 'base', 'txHash': f'0x{height:064x}',
+                'data': {'prep': {'rewardAmount': hex(ICX), 'rewardRate': '0x0'}}}
+        return {'version': '2.0', 'height': height, 'block_hash': f'{height:064x}',
+                'prev_block_hash': f'{height - 1:064x}', 'merkle_tree_root_hash': '0' * 64,
+                'time_stamp': timestamp, 'peer_id': self.preps[height % len(self.preps)]['address']
+                if self.preps else None, 'signature': '', 'confirmed_transaction_list': [base] + txs}
+
+    def handle(self, method, params):
+        current = self.height
+        height = int(params['height'], 16) if 'height' in params else current
+        if height > current:
+            raise MockError(-31004, f'NotFound: height {height}')
+        if method == 'icx_call':
+            data = params['data']
+            return self.call(params['to'], data['method'], data.get('params', {}), height)
+        if method == 'icx_getBalance':
+            return hex(self.state(params['address'], height).at(height).balance)
+        if method == 'icx_getTotalSupply':
+            return hex(self.total_supply(height))
+        if method == 'icx_getLastBlock':
+            return self.get_block(current)
+        if method == 'icx_getBlockByHeight':
+            return self.get_block(height)
+        if method in ('icx_sendTransaction', 'icx_sendTransactionAndWait'):
+            return self.send_transaction(params)
+        if method in ('icx_getTransactionResult', 'icx_getTransactionByHash'):
+            with self._lock:
+                item = self._txs.get(params['txHash'])
+            if item is None:
+                raise MockError(-31004, f'NotFound: transaction {params["txHash"]}')
+            return item[1] if method == 'icx_getTransactionResult' else item[0]
+        if method == 'icx_getScoreStatus':
+            return self._call_chain('getScoreStatus', params, height)
+        if method == 'icx_getNetworkInfo':
+            return {'platform': 'icon', 'nid': '0x3', 'channel': 'icon_dex', 'earliest': '0x0',
+                    'latest': hex(current), 'stepPrice': hex(self.STEP_PRICE)}
+        if method == 'debug_estimateStep':
+            return hex(self.STEP_USED)
+        raise MockError(-32601, f'MethodNotFound: {method}')
+
+    def rpc(self, request):
+        try:
+            result = self.handle(request['method'], request.get('params', {}))
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+        except MockError as e:
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': e.code, 'message': e.message}}
+        except (KeyError, ValueError, TypeError) as e:
+            return {'jsonrpc': '2.0', 'id': request.get('id'),
+                    'error': {'code': -32602, 'message': f'InvalidParams: {e}'}}
+
+    def tracker(self, path, query):
+        # the contract list of the tracker API, used by the audit command
+        if path != '/v3/contract/list':
+            return None
+        page = int(query.get('page', ['1'])[0])
+        count = int(query.get('count', ['10'])[0])
+        return {'data': self.contracts[(page - 1) * count:page * count], 'listSize': len(self.contracts)}
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # the headers and the body are written separately, don't hold the body for the ack
+    disable_nagle_algorithm = True
+
+    def _delay(self, calls=1):
+        server = self.server
+        delay = server.latency + random.uniform(0, server.jitter) + server.call_latency * calls
+        if delay > 0:
+            time.sleep(delay)
+
+    def _fault(self):
+        # one of the injected errors by the rates, or None
+        r = random.random()
+        for kind, rate in self.server.errors.items():
+            if r < rate:
+                return kind
+            r -= rate
+        return None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        items = body if isinstance(body, list) else [body]
+        self._delay(len(items))
+        fault = self._fault()
+        if fault == 'drop':
+            self.close_connection = True
+            return
+        if fault == 'timeout':
+            time.sleep(self.server.stall)
+        elif fault in ('server', 'rate-limit'):
+            code = 503 if fault == 'server' else 429
+            self._send(code, 'text/html', f'<html><body>{code}</body></html>'.encode())
+            return
+        node = self.server.node
+        responses = []
+        for item in items:
+            if fault == 'overflow':
+                error = {'code': -31001, 'message': 'PoolOverflow: too many requests'}
+                responses.append({'jsonrpc': '2.0', 'id': item.get('id'), 'error': error})
+            elif fault == 'behind' and 'height' in item.get('params', {}):
+                error = {'code': -31004, 'message': 'NotFound: height is not reached'}
+                responses.append({'jsonrpc': '2.0', 'id': item.get('id'), 'error': error})
+            else:
+                responses.append(node.rpc(item))
+        if isinstance(body, list):
+            self._reply(200, responses)
+        else:
+            self._reply(200 if 'result' in responses[0] else 400, responses[0])
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self._reply(200, {'status': 'ok'})
+            return
+        self._delay()
+        content = self.server.node.tracker(url.path, parse_qs(url.query))
+        if content is None:
+            self._reply(404, {'error': 'not found'})
+        else:
+            self._reply(200, content)
+
+    def _reply(self, code, body):
+        self._send(code, 'application/json', json.dumps(body).encode())
+
+    def _send(self, code, content_type, content):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    ERRORS = ('server', 'rate-limit', 'overflow', 'behind', 'timeout', 'drop')
+
+    def __init__(self, address, node, latency=0.0, jitter=0.0, call_latency=0.0, errors=None, stall=15.0):
+        super().__init__(address, MockRequestHandler)
+        self.node = node
+        self.latency = latency
+        self.jitter = jitter
+        self.call_latency = call_latency
+        self.errors = errors if errors else {}
+        self.stall = stall
+
+
+def error_type(value):
+    kind, _, rate = value.partition('=')
+    if kind not in MockHTTPServer.ERRORS:
+        raise argparse.ArgumentTypeError(f'error kind should be one of {MockHTTPServer.ERRORS}')
+    try:
+        return kind, float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid rate: {rate}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock ICON node for the benchmarks and the load tests')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='address to listen on')
+    parser.add_argument('--port', type=int, default=9082, help='port for the JSON-RPC API')
+    parser.add_argument('--tracker-port', type=int, help='another port for the tracker API (80 for the local nid)')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random seconds added up to this')
+    parser.add_argument('--call-latency', type=float, default=0.0, help='seconds added for each call in a batch')
+    parser.add_argument('--error', type=error_type, action='append', default=[], metavar='KIND=RATE',
+                        help=f'inject the errors to the fraction of the requests, KIND is one of '
+                             f'{", ".join(MockHTTPServer.ERRORS)}')
+    parser.add_argument('--stall', type=float, default=15.0, help='seconds to hold the "timeout" requests')
+    parser.add_argument('--preps', type=int, default=150, help='number of P-Reps')
+    parser.add_argument('--contracts', type=int, default=300, help='number of contracts in the tracker')
+    parser.add_argument('--accounts', type=int, default=1_000_000, help='number of the synthetic accounts')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the synthetic state')
+    parser.add_argument('--fund', type=str, action='append', default=[], metavar='ADDRESS',
+                        help='give 1,000,000,000 ICX to the address (e.g. the wallet sending transactions)')
+    parser.add_argument('--block-time', type=float, default=0.0,
+                        help='seconds per block to advance the height over time (default: only by transactions)')
+    parser.add_argument('--addresses', type=int, metavar='COUNT',
+                        help='print the addresses of the synthetic accounts and exit')
+    args = parser.parse_args()
+
+    if args.addresses is not None:
+        for i in range(min(args.addresses, args.accounts)):
+            print(MockNode.address('hx', i))
+        return
+    node = MockNode(args.preps, args.contracts, args.accounts, args.seed, args.fund, args.block_time)
+    errors = dict(args.error)
+    servers = [MockHTTPServer((args.host, args.port), node, args.latency, args.jitter, args.call_latency,
+                              errors, args.stall)]
+    if args.tracker_port:
+        servers.append(MockHTTPServer((args.host, args.tracker_port), node, args.latency, args.jitter))
+    for server in servers[1:]:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f'Serving on http://{args.host}:{args.port}', flush=True)
+    try:
+        servers[0].serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
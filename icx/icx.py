@@ -16,7 +16,7 @@ from iconsdk.exception import JSONRPCException
 
 from iiss.stake import Stake
 from score.gov import Governance
-from util import die, in_icx, in_loop, print_response
+from util import die, emit, in_icx, in_loop, is_text_output, print_response
 from util.checks import address_type
 
 
@@ -30,13 +30,19 @@ class ICX(object):
         status = {
             'ICX (avail)': in_icx(balance)
         }
+        record = {'address': address, 'balance': balance}
         if is_all:
             result = Stake(self._tx_handler).query(address)
             current_stake = int(result['stake'], 16)
             status['ICX (stake)'] = in_icx(current_stake)
             status['Total ICX  '] = in_icx(balance + current_stake)
-        print('\n[ICX Balance]')
-        print_response(address, status)
+            record['stake'] = current_stake
+            record['total'] = balance + current_stake
+        if is_text_output():
+            print('\n[ICX Balance]')
+            print_response(address, status)
+        else:
+            emit('balance', record)
         return balance
 
     def transfer(self, address, to, amount, keystore):
@@ -113,6 +119,9 @@ def run(args):
         icx.transfer(address, to, args.amount, args.keystore)
     elif args.private:
         wallet = args.keystore.get_wallet()
-        print("private key =", wallet.get_private_key())
+        if is_text_output():
+            print("private key =", wallet.get_private_key())
+        else:
+            emit('private', {'address': wallet.get_address(), 'privateKey': wallet.get_private_key()})
     else:
         icx.balance(address, args.all)
@@ -13,13 +13,15 @@
 # limitations under the License.
 
 import argparse
+from fractions import Fraction
 
 from iconsdk.exception import JSONRPCException
 
 from iiss.prep import PRep
 from score.chain import ChainScore
-from util import die, in_icx, print_response
-from util.checks import address_type
+from util import die, emit, in_icx, is_text_output, print_response
+from util.checks import address_type, icx_amount_type
+from util.indexer import EventIndex, print_history
 
 
 class Delegate(object):
@@ -123,7 +125,7 @@ class Delegate(object):
         print_response(header, delegations)
         print('Remaining votingPower =', voting_power, f"({in_icx(voting_power)} ICX)")
 
-    def print_status(self, address, result, bond=False):
+    def print_status(self, address, result, bond=False, preps=None):
         if bond:
             keymap = {"header": "Bonds",
                       "name": "bonds",
@@ -135,11 +137,21 @@ class Delegate(object):
                       "total": "totalDelegated",
                       "footer": "Total Delegated"}
 
-        print(f"\n[{keymap['header']} of \"{address}\"]")
         delegations = result[keymap['name']]
         total_delegated = int(result[keymap['total']], 16)
-        name_map = self._prep.prep_names()
+        name_map = self._prep.prep_names(preps)
         sorted_delegations = sorted(delegations, key=lambda d: int(d['value'], 16), reverse=True)
+        if not is_text_output():
+            for d in sorted_delegations:
+                emit(keymap['name'], {
+                    'owner': address,
+                    'address': d['address'],
+                    'name': name_map.get(d['address']),
+                    'value': int(d['value'], 16),
+                })
+            emit(keymap['total'], {'owner': address, 'value': total_delegated})
+            return
+        print(f"\n[{keymap['header']} of \"{address}\"]")
         print(">>> Count:", len(sorted_delegations))
         for d in sorted_delegations:
             addr = d['address']
@@ -149,12 +161,166 @@ class Delegate(object):
         print(f"{'>>> ' + keymap['footer'] + ':':>58} {total_delegated:26d} ({in_icx(total_delegated)} ICX) <<<")
 
 
+class DelegationOptimizer(object):
+    ACTIVE_GRADES = ('0x0', '0x1')  # main and sub P-Reps
+
+    def __init__(self, tx_handler, tolerance=0, cap=None, preps=None):
+        self._tx_handler = tx_handler
+        self._delegate = Delegate(tx_handler)
+        self._prep = PRep(tx_handler)
+        self._tolerance = tolerance
+        self._cap = cap
+        self._preps = dict((p['address'], p) for p in preps) if preps is not None else None
+
+    @property
+    def preps(self):
+        # the P-Rep table is fetched once and shared by the policies and the report
+        if self._preps is None:
+            preps = self._prep.get_preps()['preps']
+            self._preps = dict((p['address'], p) for p in preps)
+        return self._preps
+
+    def top_weights(self, count):
+        candidates = [p for p in self.preps.values()
+                      if p.get('grade') in self.ACTIVE_GRADES and int(p.get('jailFlags', '0x0'), 16) == 0]
+        candidates.sort(key=lambda p: (int(p.get('commissionRate', '0x0'), 16), -int(p.get('power', '0x0'), 16)))
+        if len(candidates) == 0:
+            # an empty target would remove all the current delegations
+            die('Error: no active P-Rep to delegate to')
+        return dict((p['address'], Fraction(1)) for p in candidates[:count])
+
+    def read_weights(self, path):
+        weights = {}
+        with open(path, "r") as f:
+            for line in f:
+                line = line.split('#')[0].strip()
+                if len(line) == 0:
+                    continue
+                try:
+                    address, weight = line.split()
+                    address = address_type(address)
+                    weights[address] = Fraction(weight)
+                except (ValueError, argparse.ArgumentTypeError):
+                    die(f'Error: invalid line in {path}: {line}')
+                if address not in self.preps:
+                    die(f'Error: not a P-Rep: {address}')
+                if weights[address] <= 0:
+                    del weights[address]
+        if len(weights) == 0:
+            die(f'Error: no target weight in {path}')
+        return weights
+
+    def _allocate(self, total, weights):
+        # split the total by the weights, the excess over the cap goes to the others
+        targets = {}
+        active = dict(weights)
+        remaining = total
+        while len(active) > 0:
+            weight_sum = sum(active.values())
+            shares = dict((a, int(remaining * w / weight_sum)) for a, w in active.items())
+            capped = [a for a, v in shares.items() if self._cap is not None and v > self._cap]
+            if len(capped) == 0:
+                targets.update(shares)
+                # the rounding remainder goes to the heaviest one
+                first = max(active, key=lambda a: active[a])
+                targets[first] += remaining - sum(shares.values())
+                break
+            for a in capped:
+                targets[a] = self._cap
+                remaining -= self._cap
+                del active[a]
+        return targets
+
+    def optimize(self, result, weights):
+        current = dict((a, int(v, 16)) for a, v in self._delegate.convert_to_map(result['delegations']).items())
+        total = int(result['totalDelegated'], 16) + int(result['votingPower'], 16)
+        targets = self._allocate(total, weights)
+        # keep the current values within the tolerance, the difference goes to the largest changed one
+        delegations = {}
+        changed = []
+        for address, target in targets.items():
+            value = current.get(address, 0)
+            if abs(target - value) <= self._tolerance:
+                delegations[address] = value
+            else:
+                delegations[address] = target
+                changed.append(address)
+        slack = sum(targets.values()) - sum(delegations.values())
+        if slack < 0 or (slack > 0 and len(changed) > 0):
+            # the unchanged ones leave the positive slack in the voting power
+            candidates = changed if len(changed) > 0 else list(delegations.keys())
+            largest = max(candidates, key=lambda a: delegations[a])
+            delegations[largest] = max(0, delegations[largest] + slack)
+            if self._cap is not None:
+                # never over the cap, the rest stays in the voting power
+                delegations[largest] = min(self._cap, delegations[largest])
+        return current, delegations
+
+    def print_plan(self, current, delegations):
+        rows = []
+        for address in list(delegations.keys()) + [a for a in current.keys() if a not in delegations]:
+            before = current.get(address, 0)
+            after = delegations.get(address, 0)
+            if before == after:
+                change = 'unchanged'
+            elif before == 0:
+                change = 'added'
+            elif after == 0:
+                change = 'removed'
+            else:
+                change = 'changed'
+            prep = self.preps.get(address, {})
+            rows.append({
+                'address': address,
+                'name': prep.get('name'),
+                'commissionRate': int(prep['commissionRate'], 16) if 'commissionRate' in prep else None,
+                'current': before,
+                'new': after,
+                'change': change,
+            })
+        if not is_text_output():
+            for row in rows:
+                emit('rebalance', row)
+            return rows
+        print("\n[Rebalance plan]")
+        for row in rows:
+            name = row['name'] if row['name'] else "============"
+            print(f"{row['address']} ({name[:12]:12s}): {in_icx(row['current']):18.4f} -> "
+                  f"{in_icx(row['new']):18.4f} ICX  {row['change']}")
+        print('>>> Changes:', sum(1 for row in rows if row['change'] != 'unchanged'))
+        return rows
+
+    def ask_to_rebalance(self, result, weights, keystore):
+        current, delegations = self.optimize(result, weights)
+        rows = self.print_plan(current, delegations)
+        if all(row['change'] == 'unchanged' for row in rows):
+            print('Delegations are already balanced')
+            return
+        confirm = input('\n==> Are you sure you want to set new delegations? (y/n) ')
+        if confirm == 'y':
+            wallet = keystore.get_wallet()
+            tx_hash = self._delegate.set(wallet, dict((a, hex(v)) for a, v in delegations.items()))
+            self._tx_handler.ensure_tx_result(tx_hash, True)
+
+
 def add_parser(cmd, subparsers):
     delegate_parser = subparsers.add_parser('delegate', help='Query and set delegations')
     delegate_parser.add_argument('--address', type=address_type, help='target address to perform operations')
     delegate_parser.add_argument('--height', type=int, help='target block height')
     delegate_parser.add_argument('--set', action='store_true', help='set new delegations')
     delegate_parser.add_argument('--bond', action='store_true', help='perform bond operations')
+    delegate_parser.add_argument('--index', type=str, metavar='FILE',
+                                 help='show the delegation (or bond) history from the index file')
+    delegate_parser.add_argument('--rebalance', action='store_true',
+                                 help='rebalance the delegations by the target weights or the top P-Reps')
+    delegate_parser.add_argument('--weights', type=str, metavar='WEIGHT_FILE',
+                                 help='file listing the target P-Rep and weight, one pair per line')
+    delegate_parser.add_argument('--top', type=int, metavar='N',
+                                 help='spread evenly across the top N P-Reps by the lowest commission rate')
+    delegate_parser.add_argument('--cap', type=icx_amount_type, metavar='ICX', help='maximum delegation to one P-Rep')
+    delegate_parser.add_argument('--tolerance', type=icx_amount_type, default='1.0', metavar='ICX',
+                                 help='keep the current delegation if it is within this from the target '
+                                      '(default: 1.0)')
 
     # register method
     setattr(cmd, 'delegate', run)
@@ -164,6 +330,22 @@ def run(args):
     delegate = Delegate(args.txhandler)
     address = args.address if args.address else args.keystore.address
     result = delegate.query(address, args.height, args.bond)
-    delegate.print_status(address, result, args.bond)
-    if args.set:
+    # the P-Rep table is shared with the rebalance
+    preps = PRep(args.txhandler).get_preps()['preps'] if args.rebalance else None
+    delegate.print_status(address, result, args.bond, preps)
+    if args.index:
+        print_history(EventIndex(args.index), address, ('bond',) if args.bond else ('delegation',))
+    if args.rebalance:
+        if args.bond or args.height is not None:
+            die('Error: "rebalance" option cannot be used with "bond" or "height"')
+        # both are in loop already
+        optimizer = DelegationOptimizer(args.txhandler, args.tolerance, args.cap, preps)
+        if args.weights:
+            weights = optimizer.read_weights(args.weights)
+        elif args.top and args.top > 0:
+            weights = optimizer.top_weights(args.top)
+        else:
+            die('Error: "weights" or "top" should be specified with "rebalance"')
+        optimizer.ask_to_rebalance(result, weights, args.keystore)
+    elif args.set:
         delegate.ask_to_set(result, args.keystore)
@@ -15,7 +15,7 @@
 import time
 
 from score.chain import ChainScore
-from util import print_response, die, in_icx
+from util import print_response, die, emit, in_icx, is_text_output
 
 TREASURY = "hx1000000000000000000000000000000000000000"
 
@@ -41,18 +41,30 @@ class Info(object):
         sequence = int(term_info['sequence'], 16)
         start_block = int(term_info['startBlockHeight'], 16)
         current_block = int(term_info['blockHeight'], 16)
-        print_response('Current', {
-            'Start': f"{start_block}",
-            'Now': f"{current_block} (elapsed: {current_block - start_block})",
-            'Sequence': sequence,
-            'Period': period,
-        })
+        if is_text_output():
+            print_response('Current', {
+                'Start': f"{start_block}",
+                'Now': f"{current_block} (elapsed: {current_block - start_block})",
+                'Sequence': sequence,
+                'Period': period,
+            })
         if not end_block:
             end_block = int(term_info['endBlockHeight'], 16)
         elif end_block <= current_block:
             die(f'Error: end_block must be greater than current_block={current_block}')
         remaining_block = end_block - current_block
         remaining_seconds = remaining_block * 2
+        if not is_text_output():
+            emit('term', {
+                'start': start_block,
+                'now': current_block,
+                'sequence': sequence,
+                'period': period,
+                'end': end_block,
+                'remaining': remaining_block,
+                'startAt': int(time.time() + remaining_seconds),
+            })
+            return
         hours = remaining_seconds // 3600
         minutes = (remaining_seconds % 3600) // 60
         seconds = (remaining_seconds % 3600) % 60
@@ -83,7 +95,10 @@ class Info(object):
         for height in range(start_block, current_block, period):
             current = trend_func(height)
             diff = current - prev
-            print(f"{height}: {current:25d} ({in_icx(current):18f} ICX) diff:{in_icx(diff):15f}")
+            if is_text_output():
+                print(f"{height}: {current:25d} ({in_icx(current):18f} ICX) diff:{in_icx(diff):15f}")
+            else:
+                emit('trend', {'key': _key, 'height': height, 'value': current, 'diff': diff})
             prev = current
 
 
@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from iconsdk.exception import JSONRPCException
+
 from score.chain import ChainScore
-from util import print_response
-from util.checks import address_type
+from util import die, emit, in_icx, is_text_output, print_response
+from util.checks import address_type, read_addresses
+from util.txhandler import TxHandler
 
 
 class IScore(object):
@@ -43,17 +46,129 @@ class IScore(object):
         print_response(address, result)
 
 
+class IScoreHistory(object):
+
+    def __init__(self, tx_handler: TxHandler):
+        self._tx_handler = tx_handler
+        self._chain = ChainScore(tx_handler)
+
+    def get_heights(self, start=None, end=None, step=None):
+        term = self._chain.call("getPRepTerm")
+        current = int(term['blockHeight'], 16)
+        period = int(term['period'], 16)
+        if end is None or end > current:
+            end = current
+        if start is None:
+            start = end - 10 * period
+        if start >= end:
+            die(f'Error: start ({start}) should be less than end ({end})')
+        if step:
+            heights = list(range(start, end, step))
+        else:
+            # the term boundaries going back from the current term
+            boundary = int(term['startBlockHeight'], 16)
+            while boundary > end:
+                boundary -= period
+            heights = sorted(range(boundary, start - 1, -period))
+            if len(heights) == 0 or heights[0] != start:
+                heights.insert(0, start)
+        if heights[-1] != end:
+            heights.append(end)
+        return heights
+
+    def fetch(self, addresses, heights):
+        requests = []
+        for address in addresses:
+            for height in heights:
+                requests.append(TxHandler.call_request(ChainScore.ADDRESS, 'queryIScore', {"address": address}, height))
+        results = self._tx_handler.batch_cached(requests)
+        size = len(heights)
+        history = {}
+        failed = []
+        for i, address in enumerate(addresses):
+            history[address] = self._to_series(address, heights, results[i * size:(i + 1) * size], failed)
+        if len(failed) == len(results):
+            die(f'Error: failed to query IScore at all the heights: {failed[0]["error"]}')
+        return history, failed
+
+    @staticmethod
+    def _to_series(address, heights, results, failed):
+        series = []
+        prev = None
+        for height, result in zip(heights, results):
+            if isinstance(result, JSONRPCException):
+                failed.append({'address': address, 'height': height, 'error': str(result)})
+                continue
+            iscore = int(result['iscore'], 16)
+            sample = {
+                'address': address,
+                'height': height,
+                'iscore': iscore,
+                'estimatedICX': int(result['estimatedICX'], 16),
+                'accrued': 0,
+                'claimed': 0,
+            }
+            if prev is not None:
+                if iscore < prev:
+                    # claimed in between, at least the previous IScore
+                    sample['claimed'] = prev
+                    sample['accrued'] = iscore
+                else:
+                    sample['accrued'] = iscore - prev
+            series.append(sample)
+            prev = iscore
+        return series
+
+    @staticmethod
+    def print_series(history, failed):
+        for address, series in history.items():
+            errors = [f for f in failed if f['address'] == address]
+            if not is_text_output():
+                for sample in series:
+                    emit('iscore', sample)
+                for error in errors:
+                    emit('iscore-error', error)
+                continue
+            print(f'\n[IScore history of "{address}"]')
+            for s in series:
+                line = f"{s['height']}: {in_icx(s['estimatedICX']):18f} ICX accrued:{in_icx(s['accrued'] // 1000):15f}"
+                if s['claimed'] > 0:
+                    line += f" claimed:{in_icx(s['claimed'] // 1000):15f}"
+                print(line)
+            total = sum(s['accrued'] for s in series)
+            print(f">>> Total accrued: {in_icx(total // 1000)} ICX ({len(series)} samples)")
+            if len(errors) > 0:
+                print(f"!!! Failed at {len(errors)} heights {[e['height'] for e in errors]}: {errors[0]['error']}")
+
+
 def add_parser(cmd, subparsers):
     iscore_parser = subparsers.add_parser('iscore', help='Query and claim IScore')
     iscore_parser.add_argument('--address', type=address_type, help='target address to perform operations')
     iscore_parser.add_argument('--claim', action='store_true', help='claim the reward that has been received')
     iscore_parser.add_argument('--height', type=int, help='target block height')
+    iscore_parser.add_argument('--history', action='store_true', help='show the reward history at the term boundaries')
+    iscore_parser.add_argument('--start', type=int, metavar='HEIGHT',
+                               help='start height of the history (default: 10 terms ago)')
+    iscore_parser.add_argument('--end', type=int, metavar='HEIGHT', help='end height of the history (default: now)')
+    iscore_parser.add_argument('--step', type=int, metavar='BLOCKS',
+                               help='sample every BLOCKS instead of the term boundaries')
+    iscore_parser.add_argument('--addresses', type=str, metavar='ADDRESS_FILE',
+                               help='file listing the target addresses, one per line')
 
     # register method
     setattr(cmd, 'iscore', run)
 
 
 def run(args):
+    if args.history:
+        if args.addresses:
+            addresses = read_addresses(args.addresses)
+        else:
+            addresses = [args.address if args.address else args.keystore.address]
+        history = IScoreHistory(args.txhandler)
+        heights = history.get_heights(args.start, args.end, args.step)
+        history.print_series(*history.fetch(addresses, heights))
+        return
     iscore = IScore(args.txhandler)
     address = args.address if args.address else args.keystore.address
     iscore.print_status(address, result=None, height=args.height)
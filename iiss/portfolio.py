@@ -0,0 +1,118 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from iconsdk.exception import JSONRPCException
+
+from score.chain import ChainScore
+from score.token import IRC2Token
+from util import emit, is_text_output
+from util.checks import read_addresses
+from util.txhandler import TxHandler
+
+
+class Portfolio(object):
+    CHAIN_QUERIES = ['getStake', 'queryIScore', 'getDelegation', 'getBond']
+
+    def __init__(self, tx_handler: TxHandler, tokens):
+        self._tx_handler = tx_handler
+        self._tokens = {}
+        for name in tokens:
+            self._tokens[name] = IRC2Token(tx_handler, name).address
+        IRC2Token.load_metadata(tx_handler, list(self._tokens.values()))
+        self._decimals = dict((name, IRC2Token.decimals_of(tx_handler, address))
+                              for name, address in self._tokens.items())
+
+    def _requests(self, address):
+        requests = [TxHandler.balance_request(address)]
+        for method in self.CHAIN_QUERIES:
+            requests.append(TxHandler.call_request(ChainScore.ADDRESS, method, {"address": address}))
+        for token_address in self._tokens.values():
+            requests.append(TxHandler.call_request(token_address, "balanceOf", {"_owner": address}))
+        return requests
+
+    def fetch(self, addresses):
+        # fetch everything for all the addresses in one batched pass
+        requests = []
+        for address in addresses:
+            requests.extend(self._requests(address))
+        results = self._tx_handler.batch(requests)
+        size = len(results) // len(addresses)
+        return [self._to_row(address, results[i * size:(i + 1) * size]) for i, address in enumerate(addresses)]
+
+    @staticmethod
+    def _value(result, key=None):
+        if isinstance(result, JSONRPCException):
+            return None
+        if key is not None:
+            result = result.get(key, '0x0')
+        return int(result, 16)
+
+    def _to_row(self, address, results):
+        balance, stake, iscore, delegation, bond = results[:5]
+        row = {
+            'address': address,
+            'available': self._value(balance),
+            'staked': self._value(stake, 'stake'),
+            'unstaking': None,
+            'iscore': self._value(iscore, 'iscore'),
+            'estimatedICX': self._value(iscore, 'estimatedICX'),
+            'delegated': self._value(delegation, 'totalDelegated'),
+            'bonded': self._value(bond, 'totalBonded'),
+        }
+        if not isinstance(stake, JSONRPCException):
+            row['unstaking'] = sum(int(u['unstake'], 16) for u in stake.get('unstakes', []))
+        for i, name in enumerate(self._tokens.keys()):
+            row[name] = self._value(results[5 + i])
+        return row
+
+    def print_table(self, rows):
+        if not is_text_output():
+            for row in rows:
+                emit('portfolio', {**row, 'decimals': self._decimals})
+            return
+        columns = [k for k in rows[0].keys() if k not in ('address', 'iscore')]
+        print('\n[Portfolio]')
+        print(f"{'address':42s} " + ' '.join(f'{c[:14]:>14s}' for c in columns))
+        totals = dict((c, 0) for c in columns)
+        # the token balances by their own decimals, ICX in 18
+        units = dict((c, 10 ** self._decimals.get(c, 18)) for c in columns)
+        for row in rows:
+            cells = []
+            for c in columns:
+                if row[c] is None:
+                    cells.append(f"{'-':>14s}")
+                else:
+                    totals[c] += row[c]
+                    cells.append(f'{row[c] / units[c]:14.4f}')
+            print(f"{row['address']} " + ' '.join(cells))
+        print(f"{'>>> Total (' + str(len(rows)) + '):':42s} " +
+              ' '.join(f'{totals[c] / units[c]:14.4f}' for c in columns))
+
+
+def add_parser(cmd, subparsers):
+    portfolio_parser = subparsers.add_parser('portfolio', help='Query balances of multiple addresses')
+    portfolio_parser.add_argument('--addresses', type=str, metavar='ADDRESS_FILE', required=True,
+                                  help='file listing the target addresses, one per line')
+    portfolio_parser.add_argument('--tokens', type=str, metavar='NAMES',
+                                  help='comma-separated token names (default: all known tokens)')
+
+    # register method
+    setattr(cmd, 'portfolio', run)
+
+
+def run(args):
+    addresses = read_addresses(args.addresses)
+    tokens = args.tokens.split(',') if args.tokens else list(IRC2Token.TOKEN_MAP.keys())
+    portfolio = Portfolio(args.txhandler, tokens)
+    portfolio.print_table(portfolio.fetch(addresses))
@@ -19,8 +19,8 @@ from iconsdk.exception import JSONRPCException
 from iconsdk.wallet.wallet import KeyWallet
 
 from score.chain import ChainScore
-from util import die, in_icx, in_loop, print_response
-from util.checks import address_type
+from util import die, in_icx, in_loop, parallel_map, print_response
+from util.checks import address_type, positive_int_type
 from util.keystore import Keystore
 
 
@@ -71,8 +71,9 @@ class PRep(object):
     def print_preps_info(self):
         print_response('P-Reps Info', self.get_preps())
 
-    def prep_names(self):
-        preps = self.get_preps()['preps']
+    def prep_names(self, preps=None):
+        if preps is None:
+            preps = self.get_preps()['preps']
         name_map = {}
         for p in list(map(lambda prep: (prep['address'], prep['name']), preps)):
             name_map[p[0]] = p[1]
@@ -119,50 +120,43 @@ class PRep(object):
         print(f"  [{wallet.get_address()}] tx_hash={tx_hash}")
         self._tx_handler.ensure_tx_result(tx_hash)
 
-    def register_test_preps(self, keystore, preps_num):
+    def _run_phase(self, name, items, submit, workers):
+        # items: a list of (wallet, arg), submitted concurrently and confirmed at once
+        print(name)
+        tx_hashes = parallel_map(lambda item: submit(*item), items, workers)
+        for (wallet, _), tx_hash in zip(items, tx_hashes):
+            print(f"  [{wallet.get_address()}] tx_hash={tx_hash}")
+        self._tx_handler.ensure_tx_results(tx_hashes)
+
+    def register_test_preps(self, keystore, preps_num, workers=8):
         god_wallet = keystore.get_wallet()
         min_delegate_value = self.get_minimum_delegation()
         transfer_value = in_loop(105_000)
-        # add god wallet as the 1st prep
+        bond_amount = in_loop(100_000)
+        required = transfer_value * (preps_num - 1) + min_delegate_value + bond_amount + in_loop(2000)
+        balance = self._tx_handler.get_balance(god_wallet.get_address())
+        if balance < required:
+            die(f'Error: not enough balance for {preps_num} P-Reps: {in_icx(balance)} < {in_icx(required)} ICX')
+        # add god wallet as the 1st prep, staking for its self-bond as well
         test_preps = [god_wallet]
         delegates = [min_delegate_value]
-        tx_hash = None
+        stakes = [min_delegate_value + bond_amount]
         for i in range(preps_num - 1):
-            wallet = KeyWallet.create()
-            test_preps.append(wallet)
+            test_preps.append(KeyWallet.create())
             delegates.append(in_loop(100_000))
-            tx_hash = self._tx_handler.transfer(god_wallet, wallet.get_address(), transfer_value)
-        if tx_hash:
-            self._tx_handler.ensure_tx_result(tx_hash)
-
-        print(f"registerPRep")
-        for prep in test_preps:
-            name = f"node_{prep.get_address()}"
-            tx_hash = self.register_prep(prep, name)
-            print(f"  [{prep.get_address()}] tx_hash={tx_hash}")
-        self._tx_handler.ensure_tx_result(tx_hash)
-
-        print(f"setStake")
-        for i, prep in enumerate(test_preps):
-            tx_hash = self._chain.setStake(prep, delegates[i])
-            print(f"  [{prep.get_address()}] tx_hash={tx_hash}")
-        self._tx_handler.ensure_tx_result(tx_hash)
+            stakes.append(in_loop(100_000))
 
-        print(f"setDelegation")
-        for i, prep in enumerate(test_preps):
-            tx_hash = self.self_delegation(prep, delegates[i])
-            print(f"  [{prep.get_address()}] tx_hash={tx_hash}")
-        self._tx_handler.ensure_tx_result(tx_hash)
+        if preps_num > 1:
+            self._run_phase("transfer", [(wallet, wallet.get_address()) for wallet in test_preps[1:]],
+                            lambda wallet, to: self._tx_handler.transfer(god_wallet, to, transfer_value), workers)
+        self._run_phase("registerPRep", [(prep, f"node_{prep.get_address()}") for prep in test_preps],
+                        self.register_prep, workers)
+        self._run_phase("setStake", list(zip(test_preps, stakes)), self._chain.setStake, workers)
+        self._run_phase("setDelegation", list(zip(test_preps, delegates)), self.self_delegation, workers)
 
-        print(f"setBond")
         main_prep = test_preps[0]
-        bond_amount = in_loop(100_000)
-        self._chain.setStake(main_prep, min_delegate_value + bond_amount)
-        tx_hash = self._chain.setBonderList(main_prep, [main_prep.get_address()])
-        self._tx_handler.ensure_tx_result(tx_hash)
-        tx_hash = self.self_bond(main_prep, bond_amount)
-        print(f"  [{main_prep.get_address()}] tx_hash={tx_hash}")
-        self._tx_handler.ensure_tx_result(tx_hash)
+        self._run_phase("setBonderList", [(main_prep, [main_prep.get_address()])], self._chain.setBonderList, 1)
+        self._run_phase("setBond", [(main_prep, bond_amount)], self.self_bond, 1)
 
     def do_self_bond(self, keystore, amount):
         bond_info = self._chain.getBond(keystore.address)
@@ -224,6 +218,8 @@ def add_parser(cmd, subparsers):
                              help='register P-Rep by KEYSTORE')
     prep_parser.add_argument('--register-test-preps', type=int, metavar='NUM',
                              help='register NUM of P-Reps for testing')
+    prep_parser.add_argument('--workers', type=positive_int_type, default=8,
+                             help='number of transactions submitted concurrently with --register-test-preps')
     prep_parser.add_argument('--self-bond', type=int, metavar='AMOUNT', help='the amount of self-bond in ICX')
     prep_parser.add_argument('--set-bond', type=address_type, metavar='ADDRESS', help='set bond to the address')
     prep_parser.add_argument('--request-unjail', action='store_true', help='request unjail')
@@ -259,9 +255,9 @@ def run(args):
         prep.do_request_unjail(args.keystore)
         exit(0)
     preps_num = args.register_test_preps if args.register_test_preps else 0
-    if 0 < preps_num <= 100:
+    if preps_num > 0:
         if prep.is_test_endpoint(args.endpoint):
-            prep.register_test_preps(args.keystore, preps_num)
+            prep.register_test_preps(args.keystore, preps_num, args.workers)
             exit(0)
         else:
             die(f'Error: {args.endpoint} is not a test endpoint')
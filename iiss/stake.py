@@ -12,13 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from time import sleep
+import os
+from time import sleep, time
+
+from iconsdk.exception import IconServiceBaseException, JSONRPCException
 
 from iiss.delegate import Delegate
 from iiss.iscore import IScore
 from score.chain import ChainScore
-from util import die, in_icx, in_loop, print_response
-from util.checks import address_type
+from util import CommandExit, die, emit, get_password, in_icx, in_loop, is_text_output, parallel_map, print_response
+from util.checks import address_type, positive_int_type
+from util.indexer import EventIndex, print_history
+from util.keystore import Keystore
+from util.txhandler import TxHandler
 
 
 class Stake(object):
@@ -45,14 +51,18 @@ class Stake(object):
                 print('Error:', e.__str__())
                 continue
 
+    @staticmethod
+    def _print_balance(staked, unstaked):
+        # the machine formats keep the amounts in loop
+        if not is_text_output():
+            emit('balance', {'staked': staked, 'unstaked': unstaked})
+            return
+        print()
+        print_response('Balance (in ICX)', {'staked': in_icx(staked), 'unstaked': in_icx(unstaked)})
+
     def _get_new_amount(self, address, current_stake, auto_staking):
         balance = self._tx_handler.get_balance(address)
-        status = {
-            'staked': in_icx(current_stake),
-            'unstaked': in_icx(balance),
-        }
-        print()
-        print_response('Balance (in ICX)', status)
+        self._print_balance(current_stake, balance)
         total_icx = in_icx(current_stake + balance)
         print('Total ICX balance =', total_icx)
         if auto_staking:
@@ -89,48 +99,114 @@ class Stake(object):
             die(f'Error: amount ({amount}) should be larger than the current total delegated ({total_delegated})')
 
 
+class AutoStakePlan(object):
+
+    def __init__(self, tx_handler, address):
+        self._tx_handler = tx_handler
+        self.address = address
+        self.balance = 0
+        self.stake = 0
+        self.iscore = {}
+        self.delegations = {}
+        self.voting_power = 0
+        self.total_delegated = 0
+
+    @staticmethod
+    def _check(results):
+        for result in results:
+            if isinstance(result, JSONRPCException):
+                raise result
+        return results
+
+    def _delegation_request(self):
+        return TxHandler.call_request(ChainScore.ADDRESS, 'getDelegation', {"address": self.address})
+
+    def fetch(self):
+        # gather everything the plan needs in one batched round trip
+        results = self._check(self._tx_handler.batch([
+            TxHandler.balance_request(self.address),
+            TxHandler.call_request(ChainScore.ADDRESS, 'getStake', {"address": self.address}),
+            TxHandler.call_request(ChainScore.ADDRESS, 'queryIScore', {"address": self.address}),
+            self._delegation_request(),
+        ]))
+        self.balance = int(results[0], 16)
+        self.stake = int(results[1]['stake'], 16)
+        self.iscore = results[2]
+        self._update_delegation(results[3])
+        return self
+
+    def _update_delegation(self, result):
+        self.delegations = Delegate.convert_to_map(result['delegations'])
+        self.voting_power = int(result['votingPower'], 16)
+        self.total_delegated = int(result['totalDelegated'], 16)
+
+    # only the values changed by the confirmed transaction are queried again
+    def refresh_balance(self):
+        self.balance = self._tx_handler.get_balance(self.address)
+
+    def refresh_delegation(self):
+        self._update_delegation(self._check(self._tx_handler.batch([self._delegation_request()]))[0])
+
+    @property
+    def estimated_icx(self):
+        return int(self.iscore['estimatedICX'], 16)
+
+    def estimated_stake(self):
+        return int(in_icx(self.stake + self.balance + self.estimated_icx) - 1.0)
+
+    def new_stake(self):
+        new_amount = int(in_icx(self.stake + self.balance) - 1.0)  # leave 1.0 ICX for future transactions
+        if in_loop(new_amount) < self.total_delegated:
+            die(f'Error: amount ({in_loop(new_amount)}) should be larger than '
+                f'the current total delegated ({self.total_delegated})')
+        return new_amount
+
+    def new_delegations(self):
+        if len(self.delegations) == 0 or self.voting_power == 0:
+            return None
+        # add the remaining voting power to the first
+        delegations = dict(self.delegations)
+        first = next(iter(delegations))
+        delegations[first] = hex(self.voting_power + int(delegations.get(first), 16))
+        return delegations
+
+
 class AutoStake(Stake):
 
     def __init__(self, tx_handler):
         super().__init__(tx_handler)
         self._iscore = IScore(tx_handler)
 
-    def _show_status(self, address, current_stake):
-        result = self._iscore.query(address)
-        self._iscore.print_status(address, result)
-        estimated_icx = int(result['estimatedICX'], 16)
-        if (in_icx(estimated_icx) - 1.0) <= 0:
+    def _show_status(self, plan):
+        self._iscore.print_status(plan.address, plan.iscore)
+        if (in_icx(plan.estimated_icx) - 1.0) <= 0:
             die('Error: EstimatedICX should be larger than 1.0')
-        balance = self._tx_handler.get_balance(address)
-        total_icx = in_icx(current_stake + balance + estimated_icx)
-        new_amount = int(total_icx - 1.0)  # leave 1.0 ICX for future transactions
-        print('\nCurrent balance =', in_icx(balance))
-        print('Estimated stake amount after auto-staking =', float(new_amount))
+        print('\nCurrent balance =', in_icx(plan.balance))
+        print('Estimated stake amount after auto-staking =', float(plan.estimated_stake()))
 
-    def _claim_iscore(self, wallet):
+    def _claim_iscore(self, wallet, plan):
         print('\n>>> Claim IScore:')
         tx_hash = self._iscore.claim(wallet)
         self._tx_handler.ensure_tx_result(tx_hash, True)
+        plan.refresh_balance()
 
-    def _set_stake(self, wallet, address, current_stake):
+    def _set_stake(self, wallet, plan):
         print('\n>>> Set staking:')
-        new_amount = self._get_new_amount(address, current_stake, True)
+        self._print_balance(plan.stake, plan.balance)
+        print('Total ICX balance =', in_icx(plan.stake + plan.balance))
+        new_amount = plan.new_stake()
+        print('Requested amount =', new_amount, f'({in_loop(new_amount)} loop)')
         tx_hash = self.set(wallet, new_amount)
         self._tx_handler.ensure_tx_result(tx_hash, True)
+        plan.refresh_delegation()
 
-    def _set_delegations(self, wallet, address):
+    def _set_delegations(self, wallet, plan):
         print('\n>>> Set delegations:')
         retry_count = 3
         while True:
-            result = self._delegate.query(address)
-            delegations = self._delegate.convert_to_map(result['delegations'])
-            voting_power = int(result['votingPower'], 16)
-            self._delegate.print_delegations(delegations, voting_power, header='Current delegations')
-            if len(delegations) > 0 and voting_power > 0:
-                # add the remaining voting power to the first
-                first = next(iter(delegations))
-                amount = voting_power + int(delegations.get(first), 16)
-                delegations[first] = hex(amount)
+            self._delegate.print_delegations(dict(plan.delegations), plan.voting_power, header='Current delegations')
+            delegations = plan.new_delegations()
+            if delegations is not None:
                 self._delegate.print_delegations(delegations, 0, header='New delegations')
                 tx_hash = self._delegate.set(wallet, delegations)
                 self._tx_handler.ensure_tx_result(tx_hash, True)
@@ -141,6 +217,7 @@ class AutoStake(Stake):
                 if retry_count > 0:
                     print('Retry after 3 seconds...')
                     sleep(3)
+                    plan.refresh_delegation()
                 else:
                     die('Exit')
 
@@ -151,12 +228,94 @@ class AutoStake(Stake):
             die('Exit')
         return keystore.get_wallet()
 
-    def run(self, address, current_stake, keystore):
-        self._show_status(address, current_stake)
+    def run(self, address, keystore):
+        plan = AutoStakePlan(self._tx_handler, address).fetch()
+        self._show_status(plan)
         wallet = self._ask_to_continue(keystore)
-        self._claim_iscore(wallet)
-        self._set_stake(wallet, address, current_stake)
-        self._set_delegations(wallet, address)
+        self._claim_iscore(wallet, plan)
+        self._set_stake(wallet, plan)
+        self._set_delegations(wallet, plan)
+
+
+class FleetAutoStake(AutoStake):
+
+    def __init__(self, tx_handler, threshold, workers):
+        super().__init__(tx_handler)
+        self._threshold = in_loop(threshold)
+        self._workers = workers
+
+    @staticmethod
+    def load_keystores(path, password):
+        keystores = []
+        for name in sorted(os.listdir(path)):
+            filename = os.path.join(path, name)
+            if os.path.isfile(filename):
+                with open(filename, 'r') as f:
+                    keystores.append(Keystore(f, password))
+        if len(keystores) == 0:
+            die(f'Error: no keystore in {path}')
+        return keystores
+
+    def unlock(self, keystores):
+        def _unlock(keystore):
+            try:
+                return keystore.get_wallet()
+            except (CommandExit, IconServiceBaseException, KeyError, ValueError):
+                self._report(keystore.path, 'failed', {'error': 'failed to unlock the keystore'})
+                return None
+        wallets = parallel_map(_unlock, keystores, self._workers)
+        return [w for w in wallets if w is not None]
+
+    @staticmethod
+    def _report(address, status, details):
+        if is_text_output():
+            print(f'[{address}] {status}: ' + ', '.join(f'{k}={v}' for k, v in details.items()))
+        else:
+            emit('autostake', {'address': address, 'status': status, **details})
+        return status
+
+    def process(self, wallet):
+        # claim -> setStake -> setDelegation in order for one wallet, without any prompt
+        address = wallet.get_address()
+        try:
+            plan = AutoStakePlan(self._tx_handler, address).fetch()
+            estimated_icx = plan.estimated_icx
+            if estimated_icx < self._threshold:
+                return self._report(address, 'skipped', {'estimatedICX': estimated_icx})
+            self._tx_handler.ensure_tx_result(self._iscore.claim(wallet))
+            plan.refresh_balance()
+
+            new_amount = plan.new_stake()
+            self._tx_handler.ensure_tx_result(self.set(wallet, new_amount))
+            plan.refresh_delegation()
+
+            delegations = plan.new_delegations()
+            if delegations is None:
+                return self._report(address, 'staked', {'stake': in_loop(new_amount),
+                                                        'warning': 'no delegation or no voting power available'})
+            self._tx_handler.ensure_tx_result(self._delegate.set(wallet, delegations))
+            return self._report(address, 'done', {'claimed': estimated_icx, 'stake': in_loop(new_amount),
+                                                  'delegated': plan.voting_power})
+        except CommandExit as e:
+            return self._report(address, 'failed', {'error': e.message})
+        except IconServiceBaseException as e:
+            return self._report(address, 'failed', {'error': str(e)})
+
+    def run_once(self, wallets):
+        results = parallel_map(self.process, wallets, self._workers)
+        print(f'>>> done={results.count("done") + results.count("staked")}, '
+              f'skipped={results.count("skipped")}, failed={results.count("failed")}')
+
+    def run_fleet(self, path, password, interval=None):
+        if password is None:
+            password = get_password()
+        wallets = self.unlock(self.load_keystores(path, password))
+        while True:
+            started = time()
+            self.run_once(wallets)
+            if not interval:
+                return
+            sleep(max(0, interval - (time() - started)))
 
 
 def add_parser(cmd, subparsers):
@@ -164,20 +323,34 @@ def add_parser(cmd, subparsers):
     stake_parser.add_argument('--address', type=address_type, help='target address to perform operations')
     stake_parser.add_argument('--set', action='store_true', help='set new staking amount')
     stake_parser.add_argument('--auto', action='store_true', help='enable auto-staking')
+    stake_parser.add_argument('--fleet', type=str, metavar='KEYSTORE_DIR',
+                              help='perform auto-staking for all the keystores in the directory without prompts')
+    stake_parser.add_argument('--threshold', type=float, default=1.0, metavar='ICX',
+                              help='skip the wallets whose estimatedICX is less than this (default: 1.0)')
+    stake_parser.add_argument('--interval', type=int, metavar='SECONDS', help='repeat the fleet auto-staking')
+    stake_parser.add_argument('--workers', type=positive_int_type, default=8,
+                              help='number of wallets processed concurrently')
+    stake_parser.add_argument('--index', type=str, metavar='FILE', help='show the staking history from the index file')
 
     # register method
     setattr(cmd, 'stake', run)
 
 
 def run(args):
+    if args.fleet:
+        fleet = FleetAutoStake(args.txhandler, args.threshold, args.workers)
+        fleet.run_fleet(args.fleet, args.password, args.interval)
+        return
     stake = Stake(args.txhandler)
     address = args.address if args.address else args.keystore.address
     result = stake.query(address)
     current_stake = int(result['stake'], 16)
     stake.print_status(address, result)
+    if args.index:
+        print_history(EventIndex(args.index), address, ('stake', 'claim'))
     if args.set:
         if args.auto:
-            AutoStake(args.txhandler).run(address, current_stake, args.keystore)
+            AutoStake(args.txhandler).run(address, args.keystore)
         else:
             stake.ask_to_set(address, current_stake, args.keystore)
     elif args.auto:
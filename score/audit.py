@@ -12,21 +12,39 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import difflib
+import hashlib
+import io
 import json
+import zipfile
+import zlib
+from concurrent.futures import Future
 from datetime import datetime
+from queue import Queue
+from threading import Thread
+from time import sleep
 
 import requests
+from iconsdk.exception import IconServiceBaseException, JSONRPCException
 
 from score.gov import Governance
-from util import die, get_tracker_prefix, print_response
+from util import die, emit, get_tracker_prefix, is_text_output, print_response
+from util.cache import BoundedCache
+from util.checks import address_type, positive_int_type
 from util.txhandler import TxHandler
 
 STATUS_OK = 200
 
 
 class Audit(object):
+    IGNORE_LIST = ".audit_ignore_list"
+    VERIFY_RESULTS = ".audit_verify_results"
+    VERIFY_URL = "http://localhost:8888/v2/score/verify"
+    VERIFY_RETRIES = 3
+    VERIFY_TIMEOUT = 60
+    PREFETCH_LIMIT = 64
 
-    def __init__(self, tx_handler: TxHandler, keystore, endpoint):
+    def __init__(self, tx_handler: TxHandler, keystore, endpoint, workers=TxHandler.MAX_WORKERS):
         self._tx_handler = tx_handler
         self._keystore = keystore
         self._endpoint = endpoint
@@ -35,48 +53,141 @@ class Audit(object):
             'r': self.reject_score,
             'd': self.download_contract,
             's': self.get_score_status,
-            'v': self.verify_contract
+            'v': self.verify_contract,
+            'i': self.ignore_contract
         }
-
-    def get_pending_list(self, prefix):
-        ignore_list = []
-        if self._endpoint == 'mainnet':
-            try:
-                with open(".audit_ignore_list", "r") as f:
-                    ignore_list = json.loads(f.read())
-            except FileNotFoundError:
-                pass
-        url = f"{prefix}/v3/contract/pendingList?count=25"
-        res = requests.get(url)
-        ret = list()
-        if STATUS_OK == res.status_code:
-            content = json.loads(res.content)
-            data = content['data']
-            count = len(data)
-            for i in range(count):
-                item = data[i]
-                address = item['contractAddr']
-                if address not in ignore_list:
-                    ret.append(item)
-        return ret
+        self._ignore_list = set()
+        self._session = requests.Session()
+        # a connection for each of the verify workers
+        self._session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=max(TxHandler.MAX_WORKERS, workers)))
+        self._cache = BoundedCache(3 * self.PREFETCH_LIMIT)
+        self._tasks = None
 
     @staticmethod
-    def get_contract_list(prefix):
+    def _get_pages(url, count):
         list_size, page = 0, 0
-        count = 90
         ret = list()
         while list_size == 0 or (page * count) < list_size:
             page += 1
-            url = f"{prefix}/v3/contract/list?page={page}&count={count}&status=1"
-            res = requests.get(url)
-            if STATUS_OK == res.status_code:
-                content = json.loads(res.content)
-                data = content['data']
-                list_size = content['listSize']
-                ret.extend(data)
+            res = requests.get(f"{url}page={page}&count={count}")
+            if STATUS_OK != res.status_code:
+                break
+            content = json.loads(res.content)
+            data = content['data']
+            list_size = content.get('listSize', 0)
+            ret.extend(data)
+            if len(data) < count:
+                break
+        return ret, list_size
+
+    @classmethod
+    def load_ignore_list(cls):
+        try:
+            with open(cls.IGNORE_LIST, "r") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return set()
+        if content.lstrip().startswith('['):
+            # legacy format: a JSON list
+            return set(json.loads(content))
+        return set(line.strip() for line in content.splitlines() if len(line.strip()) > 0)
+
+    @classmethod
+    def save_ignore_list(cls, ignore_list):
+        with open(cls.IGNORE_LIST, "w") as f:
+            f.write(''.join(f'{address}\n' for address in sorted(ignore_list)))
+
+    def get_pending_list(self, prefix):
+        if self._endpoint == 'mainnet':
+            self._ignore_list = self.load_ignore_list()
+        data, _ = self._get_pages(f"{prefix}/v3/contract/pendingList?", 100)
+        return [item for item in data if item['contractAddr'] not in self._ignore_list]
+
+    @classmethod
+    def get_contract_list(cls, prefix):
+        ret, list_size = cls._get_pages(f"{prefix}/v3/contract/list?status=1&", 90)
         print("listSize =", list_size)
         return ret
 
+    def _load(self, kind, contracts, futures):
+        try:
+            if kind == 'status':
+                gov = Governance(self._tx_handler)
+                results = gov.get_score_statuses([c['contractAddr'] for c in contracts])
+            else:
+                results = self._tx_handler.batch([('icx_getTransactionByHash', {"txHash": c['createTx']})
+                                                  for c in contracts])
+                results = [r if isinstance(r, JSONRPCException) else bytes.fromhex(r['data']['content'][2:])
+                           for r in results]
+        except (Exception, IconServiceBaseException) as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if isinstance(result, JSONRPCException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            self._load(*task)
+
+    def _submit(self, kind, contracts):
+        # one background task loads a chunk, its futures are shared through the cache;
+        # the workers are daemon threads, so the exit never waits for the loads in flight
+        if self._tasks is None:
+            self._tasks = Queue()
+            for _ in range(TxHandler.MAX_WORKERS):
+                Thread(target=self._work, daemon=True).start()
+        futures = []
+        for contract in contracts:
+            future = Future()
+            self._cache.put((kind, contract['contractAddr'], contract['createTx']), future)
+            futures.append(future)
+        self._tasks.put((kind, contracts, futures))
+        return futures
+
+    def _get(self, kind, contract):
+        key = (kind, contract['contractAddr'], contract['createTx'])
+        future = self._cache.get(key)
+        if future is not None and future.done() and future.exception() is not None:
+            # a failed load is not kept, the action loads it again
+            self._cache.discard(key, future)
+            future = None
+        if future is None:
+            future = self._submit(kind, [contract])[0]
+        try:
+            return future.result()
+        except (Exception, IconServiceBaseException):
+            self._cache.discard(key, future)
+            raise
+
+    def prefetch(self, contracts):
+        # load in the background so that the actions only wait for what is not ready yet,
+        # only the reads; the verification is requested on demand
+        targets = contracts[:self.PREFETCH_LIMIT]
+        size = TxHandler.BATCH_LIMIT
+        for kind in ('status', 'content'):
+            for i in range(0, len(targets), size):
+                self._submit(kind, targets[i:i + size])
+
+    def close(self):
+        if self._tasks is not None:
+            for _ in range(TxHandler.MAX_WORKERS):
+                self._tasks.put(None)
+
+    def ignore_contract(self, contract):
+        if self._endpoint != 'mainnet':
+            die('Error: ignore list is only for mainnet')
+        self._ignore_list.add(contract['contractAddr'])
+        self.save_ignore_list(self._ignore_list)
+        print('Ignored', contract['contractAddr'])
+        return True
+
     def accept_score(self, contract):
         tx_hash = contract['createTx']
         gov = Governance(self._tx_handler)
@@ -97,40 +208,174 @@ class Audit(object):
         return False
 
     def get_score_status(self, contract):
-        address = contract['contractAddr']
-        gov = Governance(self._tx_handler)
-        print_response('status', gov.get_score_status(address))
+        print_response('status', self._get('status', contract))
         return True
 
     def download_contract(self, contract):
-        create_tx = contract['createTx']
-        result = self._tx_handler.get_tx_by_hash(create_tx)
-        if 'result' in result:
-            raw_tx = result['result']
-            content = bytes.fromhex(raw_tx['data']['content'][2:])
-            filename = f"{contract['contractAddr']}_{contract['version']}.zip"
-            with open(filename, 'wb') as dest:
-                dest.write(content)
-            print('Downloaded', filename)
-            return True
-        else:
-            die('Error: failed to get transaction data')
+        content = self._get('content', contract)
+        filename = f"{contract['contractAddr']}_{contract['version']}.zip"
+        with open(filename, 'wb') as dest:
+            dest.write(content)
+        print('Downloaded', filename)
+        return True
 
-    def verify_contract(self, contract):
-        url = "http://localhost:8888/v2/score/verify"
+    def _request_verify(self, contract, timeout):
         headers = {'Content-Type': 'application/json'}
         _data = {
             "deployTxHash": contract['createTx'],
             "network": self._endpoint
         }
+        res = self._session.post(self.VERIFY_URL, headers=headers, data=json.dumps(_data), timeout=timeout)
+        return res.status_code, res.content
+
+    def verify_contract(self, contract):
         try:
-            res = requests.post(url, headers=headers, data=json.dumps(_data))
-            print(f'status={res.status_code}, content={res.content}')
+            status_code, content = self._request_verify(contract, timeout=self.VERIFY_TIMEOUT)
+            print(f'status={status_code}, content={content}')
             return True
-        except requests.ConnectionError as e:
+        except requests.RequestException as e:
             die(f'Error: {e}')
 
+    def get_deploy_contents(self, address):
+        status = Governance(self._tx_handler).get_score_status(address)
+        if 'next' not in status:
+            die('Error: no pending deploy for the SCORE')
+        current_hash = status.get('current', {}).get('deployTxHash')
+        next_hash = status['next']['deployTxHash']
+        tx_hashes = [h for h in (current_hash, next_hash) if h]
+        # both deploy transactions in one batched round trip
+        contents = {}
+        for tx_hash, raw_tx in zip(tx_hashes, self._tx_handler.get_txs_by_hash(tx_hashes)):
+            if isinstance(raw_tx, JSONRPCException):
+                die(f'Error: failed to get transaction data: {tx_hash}')
+            contents[tx_hash] = bytes.fromhex(raw_tx['data']['content'][2:])
+        return (current_hash, contents.get(current_hash)), (next_hash, contents[next_hash])
+
+    @staticmethod
+    def _read_entries(address, tx_hash, content):
+        # entry name -> (sha256, data), unpacked in memory
+        if content is None:
+            return {}
+        entries = {}
+        try:
+            with zipfile.ZipFile(io.BytesIO(content)) as zf:
+                for info in zf.infolist():
+                    if not info.is_dir():
+                        data = zf.read(info)
+                        entries[info.filename] = (hashlib.sha256(data).hexdigest(), data)
+        except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+            die(f'Error: invalid deploy content of {address} ({tx_hash}): {e}')
+        return entries
+
+    def diff_contract(self, address):
+        (old_hash, old_content), (new_hash, new_content) = self.get_deploy_contents(address)
+        old_entries = self._read_entries(address, old_hash, old_content)
+        new_entries = self._read_entries(address, new_hash, new_content)
+        print(f'[Diff] {address}: {old_hash} -> {new_hash}')
+        counts = {'added': 0, 'removed': 0, 'changed': 0, 'unchanged': 0}
+        for name in sorted(set(old_entries.keys()) | set(new_entries.keys())):
+            old_digest, old_data = old_entries.get(name, (None, b''))
+            new_digest, new_data = new_entries.get(name, (None, b''))
+            if old_digest == new_digest:
+                counts['unchanged'] += 1
+                continue
+            change = 'added' if old_digest is None else 'removed' if new_digest is None else 'changed'
+            counts[change] += 1
+            if not is_text_output():
+                emit('diff', {'address': address, 'name': name, 'change': change,
+                              'oldSha256': old_digest, 'newSha256': new_digest,
+                              'oldSize': len(old_data), 'newSize': len(new_data)})
+                continue
+            print(f'\n>>> {change}: {name} ({len(old_data)} -> {len(new_data)} bytes)')
+            try:
+                old_lines = old_data.decode().splitlines(keepends=True)
+                new_lines = new_data.decode().splitlines(keepends=True)
+            except UnicodeDecodeError:
+                print(f'    sha256: {old_digest} -> {new_digest}')
+                continue
+            for line in difflib.unified_diff(old_lines, new_lines, f'a/{name}', f'b/{name}'):
+                print(line, end='' if line.endswith('\n') else '\n')
+        print('\n>>> ' + ', '.join(f'{k}={v}' for k, v in counts.items()))
+
+    def _verify_with_retry(self, contract):
+        # retry the connection failures and the server errors with backoff
+        result = None
+        for attempt in range(self.VERIFY_RETRIES):
+            if attempt > 0:
+                sleep(2 ** attempt)
+            try:
+                status_code, content = self._request_verify(contract, timeout=300)
+                result = {'status': status_code, 'content': content.decode(errors='replace')}
+                if status_code < 500 and status_code != 429:
+                    break
+            except (requests.ConnectionError, requests.Timeout) as e:
+                result = {'status': None, 'content': str(e)}
+        result['attempts'] = attempt + 1
+        return result
+
+    @staticmethod
+    def _verified(result):
+        return isinstance(result['status'], int) and 200 <= result['status'] < 300
+
+    def verify_batch(self, contracts, workers):
+        try:
+            with open(self.VERIFY_RESULTS, "r") as f:
+                stored = json.loads(f.read())
+        except FileNotFoundError:
+            stored = {}
+        # the verified deploys are skipped, a new deploy comes with a new createTx
+        todo = [c for c in contracts if c['createTx'] not in stored]
+        results = {}
+        queue = Queue(maxsize=2 * workers)
+
+        def _worker():
+            while True:
+                contract = queue.get()
+                if contract is None:
+                    return
+                try:
+                    results[contract['createTx']] = self._verify_with_retry(contract)
+                except Exception as e:
+                    # any other failure is reported with the contract, the worker goes on
+                    results[contract['createTx']] = {'status': 'error', 'content': str(e)}
+
+        threads = [Thread(target=_worker, daemon=True) for _ in range(min(workers, max(1, len(todo))))]
+        for t in threads:
+            t.start()
+        for contract in todo:
+            queue.put(contract)
+        for _ in threads:
+            queue.put(None)
+        for t in threads:
+            t.join()
+
+        for i, contract in enumerate(contracts):
+            create_tx = contract['createTx']
+            result = results.get(create_tx)
+            if result is None:
+                stored_result = stored.get(create_tx)
+                if stored_result is not None:
+                    result = {**stored_result, 'cached': True}
+                else:
+                    result = {'status': None, 'content': 'not verified'}
+            elif self._verified(result):
+                stored[create_tx] = {'status': result['status'], 'content': result['content']}
+            if is_text_output():
+                cached = ' (cached)' if result.get('cached') else ''
+                print(f"[{i}] {contract['contractName']}, {create_tx} - status={result['status']}{cached}, "
+                      f"content={result['content']}")
+            else:
+                emit('verify', {'index': i, 'name': contract['contractName'], 'address': contract['contractAddr'],
+                                'createTx': create_tx, **result})
+        with open(self.VERIFY_RESULTS, "w") as f:
+            f.write(json.dumps(stored))
+        failed = sum(1 for r in results.values() if not self._verified(r))
+        print(f'>>> verified={len(results) - failed}, cached={len(contracts) - len(todo)}, failed={failed}')
+
     def run(self, args):
+        if args.diff:
+            self.diff_contract(args.diff)
+            return
         prefix = get_tracker_prefix(self._tx_handler.nid)
         if prefix is None:
             die('Cannot find tracker server')
@@ -149,10 +394,18 @@ class Audit(object):
                 name = item['contractName']
                 address = item['address']
                 results[address] = f'{name}, {verified_data}'
-            print(json.dumps(results))
+                emit('contract', {'address': address, 'name': name, 'verifiedDate': verified_data})
+            if is_text_output():
+                print(json.dumps(results))
         elif args.dump_java:
             print("count =", len(contracts))
             self.print_java_contracts(contracts)
+        elif args.verify_batch:
+            self.verify_batch(contracts, args.workers)
+        elif args.export and not is_text_output():
+            for i, item in reversed(list(enumerate(contracts))):
+                emit('export', {'index': i, 'version': item['version'], 'name': item['contractName'],
+                                'address': item['contractAddr']})
         elif args.export:
             print('{')
             for i, item in reversed(list(enumerate(contracts))):
@@ -165,13 +418,15 @@ class Audit(object):
                     print(f'    "{i}:{version}:{name}": "{address}"')
             print('}')
         else:
+            if args.interactive:
+                self.prefetch(contracts)
             self.print_pending_contracts(contracts)
             while args.interactive:
                 try:
                     num = input('\n==> Select: ')
                     if 0 <= int(num) < len(contracts):
-                        action = input('Action ([a]ccept, [r]eject, [s]tatus, [d]ownload, [v]erify: ')
-                        if len(action) == 1 and action in "ardvs":
+                        action = input('Action ([a]ccept, [r]eject, [s]tatus, [d]ownload, [v]erify, [i]gnore: ')
+                        if len(action) == 1 and action in "ardvsi":
                             _handler = self._method_handler[action]
                             if _handler(contracts[int(num)]):
                                 continue
@@ -181,6 +436,9 @@ class Audit(object):
                         raise ValueError(f'Error: invalid input: {num}')
                 except KeyboardInterrupt:
                     die('exit')
+                except (IconServiceBaseException, requests.RequestException) as e:
+                    print(f'Error: {e}')
+                    continue
                 except ValueError as e:
                     print(e.__str__())
                     self.print_pending_contracts(contracts)
@@ -189,6 +447,16 @@ class Audit(object):
     @staticmethod
     def print_pending_contracts(contracts):
         for i, item in enumerate(contracts):
+            if not is_text_output():
+                emit('pending', {
+                    'index': i,
+                    'version': item['version'],
+                    'name': item['contractName'],
+                    'createTx': item['createTx'],
+                    'address': item['contractAddr'],
+                    'createDate': item['createDate'],
+                })
+                continue
             version = item['version']
             name = item['contractName']
             create_tx = item['createTx']
@@ -198,21 +466,29 @@ class Audit(object):
 
     def print_java_contracts(self, contracts):
         results = {}
-        gov = Governance(self._tx_handler)
-        for i, item in enumerate(contracts):
-            verified_data = item['verifiedDate']
+        candidates = []
+        for item in contracts:
             try:
-                if datetime.fromisoformat(verified_data).year >= 2022:
-                    name = item['contractName']
-                    address = item['address']
-                    status = gov.get_score_status(address)
-                    current = status['current']
-                    if current['deployTxHash'] == current['auditTxHash']:
-                        results[address] = f'{name}, {verified_data}'
+                if datetime.fromisoformat(item['verifiedDate']).year >= 2022:
+                    candidates.append(item)
             except ValueError:
                 print("[ValueError]", item)
+        # the statuses of all the candidates in batched round trips
+        statuses = Governance(self._tx_handler).get_score_statuses([item['address'] for item in candidates])
+        for item, status in zip(candidates, statuses):
+            if isinstance(status, JSONRPCException):
+                print("[Error]", item['address'], status.message)
+                continue
+            name = item['contractName']
+            address = item['address']
+            verified_data = item['verifiedDate']
+            current = status['current']
+            if current['deployTxHash'] == current['auditTxHash']:
+                results[address] = f'{name}, {verified_data}'
+                emit('contract', {'address': address, 'name': name, 'verifiedDate': verified_data})
 
-        print(json.dumps(results))
+        if is_text_output():
+            print(json.dumps(results))
 
 
 def add_parser(cmd, subparsers):
@@ -221,11 +497,19 @@ def add_parser(cmd, subparsers):
     audit_parser.add_argument('--export', action='store_true', help='export pending list as json')
     audit_parser.add_argument('--dump-java', action='store_true', help='dump Java contract list')
     audit_parser.add_argument('--dump-contract', action='store_true', help='dump active contract list')
+    audit_parser.add_argument('--diff', type=address_type, metavar='ADDRESS',
+                              help='diff the pending deploy content against the current one')
+    audit_parser.add_argument('--verify-batch', action='store_true', help='verify all the pending contracts')
+    audit_parser.add_argument('--workers', type=positive_int_type, default=8,
+                              help='number of concurrent verify requests')
 
     # register method
     setattr(cmd, 'audit', run)
 
 
 def run(args):
-    audit = Audit(args.txhandler, args.keystore, args.endpoint)
-    audit.run(args)
+    audit = Audit(args.txhandler, args.keystore, args.endpoint, args.workers)
+    try:
+        audit.run(args)
+    finally:
+        audit.close()
@@ -15,7 +15,7 @@
 import json
 
 from score import Score
-from util import die, print_response, in_icx
+from util import die, emit, print_response, in_icx, is_text_output
 from util.checks import address_type
 
 
@@ -48,6 +48,9 @@ class BalancedDex(Score):
     def print_balance(self, pool_id, address):
         bal = self.balance(pool_id, address)
         price_in_loop = int(bal, 16)
+        if not is_text_output():
+            emit('balance', {'poolId': pool_id, 'address': address, 'balance': price_in_loop})
+            return price_in_loop
         price_in_icx = in_icx(price_in_loop)
         print('\n[Balance]')
         print(f'{price_in_loop} ({price_in_icx:.4f})')
@@ -59,7 +62,9 @@ class BalancedDex(Score):
         price = int(stats['price'], 16)
         base = int(stats['base'], 16)
         quote = int(stats['quote'], 16)
-        if pool_name is not None:
+        if not is_text_output():
+            emit('pool', {'poolId': pool_id, 'height': height, **stats})
+        elif pool_name is not None:
             base_name, quote_name = pool_name.split('/')
             print()
             print_response(pool_name, {
@@ -80,7 +85,10 @@ class BalancedDex(Score):
         addr1 = IRC2Token(self._tx_handler, token1.lower()).address
         addr2 = IRC2Token(self._tx_handler, token2.lower()).address
         pool_id = int(self.get_pool_id(addr1, addr2), 16)
-        print(f'{token1}/{token2} = {pool_id}')
+        if is_text_output():
+            print(f'{token1}/{token2} = {pool_id}')
+        else:
+            emit('poolId', {'pair': f'{token1}/{token2}', 'poolId': pool_id})
         return pool_id
 
     def transfer_token(self, pool_id, to, keystore):
@@ -14,7 +14,7 @@
 
 from score import Score
 from score.token import IRC2Token
-from util import die, print_response, in_icx
+from util import die, emit, print_response, in_icx, is_text_output
 from util.checks import address_type
 
 
@@ -30,6 +30,9 @@ class CraftStaking(Score):
     def print_balance(self, address):
         bal = self.balance(address, 0x0)
         price_in_loop = int(bal, 16)
+        if not is_text_output():
+            emit('staked', {'address': address, 'balance': price_in_loop})
+            return price_in_loop
         price_in_icx = in_icx(price_in_loop)
         print(f'\n[Staked]')
         print(f'"{bal}" ({price_in_icx:.2f} CFT)')
@@ -129,6 +132,17 @@ class CraftReward(Score):
         return f'{value} ({in_icx(value):.4f} {symbol})'
 
     def print_rewards(self, address):
+        if not is_text_output():
+            emit('rewards', {
+                'address': address,
+                'liquidity': self.query_rewards(address),
+                'lp_staking': self.query_lp_rewards(address),
+                'cft_staking': self.query_staking_rewards(address),
+                'lastClaimedDay': self.last_claimed_day(address),
+                'lastConvertedDay': self.last_converted_day(),
+                'currentDay': self.current_day(),
+            })
+            return
         print()
         print_response('[Rewards]', self.query_all_rewards(address))
         last_claimed_day = int(self.last_claimed_day(address), 16)
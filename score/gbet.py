@@ -14,7 +14,7 @@
 
 from score import Score
 from score.token import IRC2Token
-from util import print_response, in_icx
+from util import print_response, in_icx, is_text_output
 
 
 class GBetSkill(Score):
@@ -33,7 +33,8 @@ class GBetSkill(Score):
         result = self.get_allocated_claim_amt(nft_id)
         print_response(f'#{nft_id}', result)
         total = int(result["total"], 16)
-        print(f'Total amount: {in_icx(total)} GBET')
+        if is_text_output():
+            print(f'Total amount: {in_icx(total)} GBET')
         return total
 
     def ask_to_claim(self, keystore, nft_id):
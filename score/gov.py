@@ -14,9 +14,12 @@
 
 import json
 
+import requests
+from iconsdk.exception import IconServiceBaseException, JSONRPCException
+
 from score import Score
 from score.chain import ChainScore
-from util import die, print_response
+from util import CommandExit, die, emit, is_text_output, parallel_map, print_response
 from util.checks import address_type, tx_hash_type
 
 
@@ -98,42 +101,105 @@ class Governance(Score):
             die(f'Error: {msg}')
         return False
 
-    def accept_score(self, wallet, tx_hash):
+    def _accept(self, wallet, tx_hash):
         params = {
             "txHash": tx_hash
         }
-        res_hash = self.invoke(wallet, "acceptScore", params, limit=1_000_000)
-        self._tx_handler.ensure_tx_result(res_hash, True)
+        return self.invoke(wallet, "acceptScore", params, limit=1_000_000)
 
-    def reject_score(self, wallet, tx_hash, reason):
+    def _reject(self, wallet, tx_hash, reason):
         if not reason:
             die('Error: reason should be specified for rejecting')
         params = {
             "txHash": tx_hash,
             "reason": reason
         }
-        res_hash = self.invoke(wallet, "rejectScore", params, limit=500_000)
+        return self.invoke(wallet, "rejectScore", params, limit=500_000)
+
+    def accept_score(self, wallet, tx_hash):
+        res_hash = self._accept(wallet, tx_hash)
         self._tx_handler.ensure_tx_result(res_hash, True)
 
+    def reject_score(self, wallet, tx_hash, reason):
+        res_hash = self._reject(wallet, tx_hash, reason)
+        self._tx_handler.ensure_tx_result(res_hash, True)
+
+    def get_score_statuses(self, addresses):
+        return self._tx_handler.call_many([(ChainScore.ADDRESS, "getScoreStatus", {"address": address}, None)
+                                           for address in addresses])
+
+    @staticmethod
+    def _print_review(rows, action):
+        if not is_text_output():
+            for row in rows:
+                emit('review', row)
+            return
+        print(f'\n[Review] {action}')
+        for row in rows:
+            tx_hash = row['deployTxHash'] if row['deployTxHash'] else '-'
+            line = f"{row['name'][:16]:16s} {row['address']} {row['status']:10s} {tx_hash}"
+            print(f"{line} {row['error']}" if row['error'] else line)
+        print('>>> Pending:', sum(1 for row in rows if row['status'] == 'pending'), f'/ {len(rows)}')
+
+    def _confirm(self, res_hash):
+        try:
+            self._tx_handler.ensure_tx_result(res_hash)
+            return 'done'
+        except CommandExit as e:
+            return e.message
+
     def process_batch(self, wallet, contracts, accept, reason):
         if accept:
             action = 'accept'
         else:
             action = 'reject'
-        for name, score_address in contracts.items():
-            print(f'\n>>> {name}: {score_address}')
-            status = self.get_score_status(score_address)
-            print_response('status', status)
-            if reason:
-                print(f'\"reason\": \"{reason}\"')
-            if status['next']['status'] == 'pending':
-                deploy_hash = status['next']['deployTxHash']
-                confirm = input(f'\n==> Are you sure you want to {action} this score? (y/n) ')
-                if confirm == 'y':
-                    if accept:
-                        self.accept_score(wallet, deploy_hash)
-                    else:
-                        self.reject_score(wallet, deploy_hash, reason)
+            if not reason:
+                die('Error: reason should be specified for rejecting')
+        # validate all the statuses up front, then review them at once
+        rows = []
+        for (name, score_address), status in zip(contracts.items(), self.get_score_statuses(contracts.values())):
+            row = {'name': name, 'address': score_address, 'status': None, 'deployTxHash': None, 'error': None}
+            if isinstance(status, JSONRPCException):
+                row['status'] = 'error'
+                row['error'] = str(status)
+            elif 'next' in status:
+                row['status'] = status['next']['status']
+                row['deployTxHash'] = status['next'].get('deployTxHash')
+            else:
+                row['status'] = 'none'
+            rows.append(row)
+        self._print_review(rows, action)
+        if reason:
+            print(f'\"reason\": \"{reason}\"')
+        pending = [row for row in rows if row['status'] == 'pending']
+        if len(pending) == 0:
+            die('Error: no pending deploy transaction')
+        confirm = input(f'\n==> Are you sure you want to {action} {len(pending)} scores? (y/n) ')
+        if confirm != 'y':
+            return
+
+        def _submit(row):
+            # a failed submission is reported with its row, the others are still confirmed
+            try:
+                if accept:
+                    return self._accept(wallet, row['deployTxHash']), None
+                return self._reject(wallet, row['deployTxHash'], reason), None
+            except CommandExit as e:
+                return None, e.message
+            except (IconServiceBaseException, requests.RequestException) as e:
+                return None, f'Error: {e}'
+
+        submitted = parallel_map(_submit, pending)
+        res_hashes = [res_hash for res_hash, _ in submitted]
+        confirmed = iter(parallel_map(self._confirm, [h for h in res_hashes if h is not None]))
+        results = [next(confirmed) if res_hash is not None else error for res_hash, error in submitted]
+        print()
+        for row, res_hash, result in zip(pending, res_hashes, results):
+            if is_text_output():
+                print(f"{row['name'][:16]:16s} {row['address']} {res_hash if res_hash else '-'} {result}")
+            else:
+                emit(action, {'name': row['name'], 'address': row['address'], 'txHash': res_hash, 'result': result})
+        print(f'>>> {action}: done={results.count("done")}, failed={len(results) - results.count("done")}')
 
 
 def add_parser(cmd, subparsers):
@@ -184,7 +250,9 @@ def run(args):
     else:
         gov.print_info()
         audit = gov.check_if_audit_enabled()
-        if audit:
+        if not is_text_output():
+            emit('audit', {'enabled': audit})
+        elif audit:
             print('Audit: enabled')
         else:
             print('Audit: disabled')
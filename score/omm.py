@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from score import Score
-from util import convert
+from util import convert, emit, is_text_output
 
 
 class OmmFeeDistribution(Score):
@@ -29,6 +29,9 @@ class OmmFeeDistribution(Score):
         return self.invoke(wallet, 'claimRewards')
 
     def print_claimable_fee(self, address):
+        if not is_text_output():
+            emit('claimableFee', {'address': address, 'fee': self.claimable_fee(address)})
+            return
         print('\n[ClaimableFee]')
         print(convert(self.claimable_fee(address)))
 
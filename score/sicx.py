@@ -16,7 +16,7 @@ from icx.icx import ICX
 from iiss.prep import PRep
 from score import Score
 from score.token import IRC2Token
-from util import die, in_icx, in_loop, print_response
+from util import die, emit, in_icx, in_loop, is_text_output, print_response
 from util.checks import address_type
 
 
@@ -86,6 +86,9 @@ class StakedICXManager(Score):
     def print_claimable_icx(self, address):
         hex_value = self.claimable_icx(address)
         price_in_loop = int(hex_value, 16)
+        if not is_text_output():
+            emit('claimable', {'address': address, 'value': price_in_loop})
+            return price_in_loop
         price_in_icx = in_icx(price_in_loop)
         print(f'\n[Claimable ICX]')
         print(f'"{hex_value}" ({price_in_icx:.2f} ICX)')
@@ -125,8 +128,12 @@ class StakedICXManager(Score):
             preps = self.top_preps()
         else:
             preps = self.valid_preps()
-        print("\n>>> Count:", len(preps))
         name_map = self._prep.prep_names()
+        if not is_text_output():
+            for p in preps:
+                emit('prep', {'type': get_type, 'address': p, 'name': name_map.get(p)})
+            return
+        print("\n>>> Count:", len(preps))
         for p in preps:
             name = name_map[p]
             print(f"{p} ({name[:12]:12s})")
@@ -137,11 +144,23 @@ class StakedICXManager(Score):
         elif get_type == "bomm":
             delegations = self.bomm_delegations(height)
             undelegated_icx = int(self.undelegated_icx(height), 16)
-            print(f">>> Undelegated ICX = {undelegated_icx} ({in_icx(undelegated_icx)} ICX)")
+            if is_text_output():
+                print(f">>> Undelegated ICX = {undelegated_icx} ({in_icx(undelegated_icx)} ICX)")
+            else:
+                emit('undelegated', {'value': undelegated_icx})
         else:
             delegations = self.final_delegations(height)
         name_map = self._prep.prep_names()
         sorted_delegations = sorted(delegations.items(), key=lambda x: int(x[1], 16), reverse=True)
+        if not is_text_output():
+            for addr, value in sorted_delegations:
+                emit('delegation', {
+                    'type': get_type,
+                    'address': addr,
+                    'name': name_map.get(addr),
+                    'value': int(value, 16),
+                })
+            return
         print(">>> Count:", len(sorted_delegations))
         sum = 0
         for d in sorted_delegations:
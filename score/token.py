@@ -12,10 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from iconsdk.exception import JSONRPCException
+
 from score import Score
 from score.baln import BalancedDex
-from util import die, print_response, in_icx, in_loop
-from util.checks import address_type
+from util import die, emit, print_response, in_loop, is_text_output
+from util.checks import address_list_type, address_type, read_addresses
+from util.indexer import EventIndex, print_history
 
 
 class IRC2Token(Score):
@@ -29,6 +32,8 @@ class IRC2Token(Score):
         'cft': 'cx2e6d0fc0eca04965d06038c8406093337f085fcf',
         'gbet': 'cx6139a27c15f1653471ffba0b4b88dc15de7e3267'
     }
+    # (nid, token address) -> {'symbol', 'decimals'}, those never change once deployed
+    METADATA = {}
 
     def __init__(self, tx_handler, name: str):
         self._name = name
@@ -45,6 +50,38 @@ class IRC2Token(Score):
         hex_value = self.call("balanceOf", {"_owner": address})
         return hex_value, int(hex_value, 16)
 
+    @classmethod
+    def get_metadata(cls, tx_handler, address):
+        return cls.METADATA.get((tx_handler.nid, address))
+
+    @classmethod
+    def load_metadata(cls, tx_handler, addresses):
+        # symbol and decimals of the tokens not known yet in one batched pass
+        missing = [address for address in addresses if cls.get_metadata(tx_handler, address) is None]
+        if len(missing) == 0:
+            return
+        calls = []
+        for address in missing:
+            calls.append((address, "symbol", None, None))
+            calls.append((address, "decimals", None, None))
+        results = tx_handler.call_many(calls)
+        for i, address in enumerate(missing):
+            symbol, decimals = results[2 * i], results[2 * i + 1]
+            if not isinstance(symbol, JSONRPCException) and not isinstance(decimals, JSONRPCException):
+                cls.METADATA[(tx_handler.nid, address)] = {'symbol': symbol, 'decimals': int(decimals, 16)}
+
+    @classmethod
+    def decimals_of(cls, tx_handler, address):
+        metadata = cls.get_metadata(tx_handler, address)
+        return metadata['decimals'] if metadata else 18
+
+    def decimals(self):
+        self.load_metadata(self._tx_handler, [self._address])
+        return self.decimals_of(self._tx_handler, self._address)
+
+    def in_units(self, value):
+        return value / 10 ** self.decimals()
+
     def transfer(self, wallet, to, value, data=None):
         param = {
             "_to": to,
@@ -56,9 +93,12 @@ class IRC2Token(Score):
 
     def print_balance(self, address):
         hex_value, price_in_loop = self.balance(address)
-        price_in_icx = in_icx(price_in_loop)
+        if not is_text_output():
+            emit('token', {'name': self._name, 'address': address, 'balance': price_in_loop,
+                           'decimals': self.decimals()})
+            return price_in_loop
         print(f'\n[Token Balance]')
-        print(f'"{hex_value}" ({price_in_icx:.2f} {self._name.upper()})')
+        print(f'"{hex_value}" ({self.in_units(price_in_loop):.2f} {self._name.upper()})')
         return price_in_loop
 
     def ask_to_transfer(self, keystore, to, to_token=None):
@@ -96,8 +136,8 @@ class IRC2Token(Score):
     def ask_to_confirm(self, address, balance, amount):
         details = {
             "recipient": address,
-            "amount": f"{amount} ({in_icx(amount)} {self._name.upper()})",
-            "estimated balance after transfer": f"{in_icx(balance - amount)}"
+            "amount": f"{amount} ({self.in_units(amount)} {self._name.upper()})",
+            "estimated balance after transfer": f"{self.in_units(balance - amount)}"
         }
         print()
         print_response('Details', details)
@@ -107,20 +147,107 @@ class IRC2Token(Score):
         return False
 
 
+class TokenSweep(object):
+
+    def __init__(self, tx_handler, contracts=None):
+        self._tx_handler = tx_handler
+        self._tokens = dict(IRC2Token.TOKEN_MAP)
+        for address in contracts or []:
+            if address not in self._tokens.values():
+                self._tokens[address] = address
+        self._load_metadata()
+
+    def _load_metadata(self):
+        IRC2Token.load_metadata(self._tx_handler, list(self._tokens.values()))
+        # use the symbol as the name of the user-supplied contracts, unless the name is taken
+        for name, address in list(self._tokens.items()):
+            metadata = IRC2Token.get_metadata(self._tx_handler, address)
+            if name != address or metadata is None:
+                continue
+            symbol = metadata['symbol'].lower()
+            if symbol in self._tokens:
+                print(f'Warning: {address} has the symbol of {self._tokens[symbol]} ({symbol}), shown by the address')
+                continue
+            del self._tokens[name]
+            self._tokens[symbol] = address
+
+    def decimals(self, address):
+        return IRC2Token.decimals_of(self._tx_handler, address)
+
+    def sweep(self, owners):
+        # balanceOf of every token for every owner in one batched pass
+        names = list(self._tokens.keys())
+        calls = [(self._tokens[name], "balanceOf", {"_owner": owner}, None) for owner in owners for name in names]
+        results = self._tx_handler.call_many(calls)
+        rows = []
+        for i, owner in enumerate(owners):
+            row = {'owner': owner}
+            for j, name in enumerate(names):
+                result = results[i * len(names) + j]
+                row[name] = None if isinstance(result, JSONRPCException) else int(result, 16)
+            rows.append(row)
+        return rows
+
+    def print_rows(self, rows):
+        names = list(self._tokens.keys())
+        if not is_text_output():
+            for row in rows:
+                for name in names:
+                    if row[name] is not None:
+                        address = self._tokens[name]
+                        emit('token', {'owner': row['owner'], 'name': name, 'address': address,
+                                       'balance': row[name], 'decimals': self.decimals(address)})
+            return
+        print('\n[Token Balances]')
+        print(f"{'owner':42s} " + ' '.join(f'{name.upper()[:14]:>14s}' for name in names))
+        totals = dict((name, 0) for name in names)
+        for row in rows:
+            cells = []
+            for name in names:
+                if row[name] is None:
+                    cells.append(f"{'-':>14s}")
+                else:
+                    totals[name] += row[name]
+                    cells.append(f'{row[name] / 10 ** self.decimals(self._tokens[name]):14.4f}')
+            print(f"{row['owner']} " + ' '.join(cells))
+        print(f"{'>>> Total (' + str(len(rows)) + '):':42s} " +
+              ' '.join(f'{totals[name] / 10 ** self.decimals(self._tokens[name]):14.4f}' for name in names))
+
+
 def add_parser(cmd, subparsers):
     token_parser = subparsers.add_parser('token', help='Token (IRC2) operations')
-    token_parser.add_argument('--name', type=str, required=True, help='token name')
+    token_parser.add_argument('--name', type=str, help='token name')
     token_parser.add_argument('--address', type=address_type, help='target address to perform operations')
     token_parser.add_argument('--transfer', type=address_type, metavar='TO', help='transfer token to the given address')
     token_parser.add_argument('--swap', type=str, metavar='TOKEN_NAME', help='swap to target token')
+    token_parser.add_argument('--sweep', type=str, metavar='ADDRESS_FILE',
+                              help='query all the token balances of the addresses in the file')
+    token_parser.add_argument('--contracts', type=address_list_type, metavar='ADDRESSES',
+                              help='comma-separated token contracts to include in the sweep')
+    token_parser.add_argument('--index', type=str, metavar='FILE',
+                              help='show the transfer history from the index file')
 
     # register method
     setattr(cmd, 'token', run)
 
 
 def run(args):
+    if args.sweep:
+        sweep = TokenSweep(args.txhandler, args.contracts)
+        sweep.print_rows(sweep.sweep(read_addresses(args.sweep)))
+        return
+    if args.index and not args.name:
+        address = args.address if args.address else args.keystore.address
+        print_history(EventIndex(args.index), address, ('transfer',))
+        return
+    if not args.name:
+        die('Error: token name should be specified')
     token = IRC2Token(args.txhandler, args.name)
     address = args.address if args.address else args.keystore.address
+    if args.index:
+        token.print_balance(address)
+        print_history(EventIndex(args.index), address, ('transfer',), token.address)
+        return
     if args.transfer:
         to = args.transfer
         token.ask_to_transfer(args.keystore, to)
@@ -12,16 +12,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import getpass
 import json
-import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
-from iconsdk.icon_service import IconService
-from iconsdk.providers.http_provider import HTTPProvider
+from util.output import Output
+
+_output = Output()
+_local = threading.local()
+_interactive = True
+
+
+class CommandExit(SystemExit):
+
+    def __init__(self, message):
+        super().__init__(-1)
+        self.message = message
 
 
 def die(message):
     print(message)
-    sys.exit(-1)
+    raise CommandExit(message)
+
+
+def set_interactive(value):
+    global _interactive
+    _interactive = value
+
+
+def get_password():
+    # nothing to prompt on without a terminal (e.g. serve mode), the password should be given
+    if not _interactive:
+        die('Error: password should be specified')
+    return getpass.getpass()
 
 
 def in_icx(value):
@@ -32,33 +57,94 @@ def in_loop(value):
     return value * 10**18
 
 
-def convert(_data):
+def parallel_map(func, items, max_workers=8):
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+    # the workers write to the output of the caller (e.g. a request in serve mode)
+    output = getattr(_local, 'output', None)
+
+    def _run(item):
+        if output is None:
+            return func(item)
+        with use_output(output):
+            return func(item)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(_run, items))
+
+
+def convert(_data, human=True):
     if isinstance(_data, dict):
         obj = {}
         for k, v in _data.items():
-            obj[k] = convert(v)
+            obj[k] = convert(v, human)
         return obj
     elif isinstance(_data, list):
         obj = []
         for v in _data:
-            obj.append(convert(v))
+            obj.append(convert(v, human))
         return obj
     elif isinstance(_data, str):
         if _data.startswith("0x") and 2 < len(_data) < 64:
             int_val = int(_data, 16)
-            if int_val > 10**16:
+            if human and int_val > 10**16:
                 return f"{int_val} ({in_icx(int_val)} ICX)"
             else:
                 return int_val
     return _data
 
 
+def get_output():
+    return getattr(_local, 'output', _output)
+
+
+def set_output(output):
+    global _output
+    _output = output
+
+
+@contextmanager
+def use_output(output):
+    # override the output for the current thread only (e.g. a request in serve mode)
+    _local.output = output
+    try:
+        yield output
+    finally:
+        del _local.output
+
+
+def is_text_output():
+    return get_output().is_text
+
+
+def emit(header, record):
+    get_output().emit(header, record)
+
+
 def print_response(header, msg):
+    output = get_output()
+    if not output.is_text:
+        output.emit(header, msg)
+        return
     res = convert(msg)
     print(f'"{header}": {json.dumps(res, indent=4)}')
 
 
-def get_icon_service(endpoint):
+ENDPOINTS_CONFIG = "endpoints.json"
+
+
+def load_endpoint_config():
+    try:
+        with open(ENDPOINTS_CONFIG, "r") as f:
+            return json.loads(f.read())
+    except FileNotFoundError:
+        return {}
+
+
+def get_icon_service(endpoint, recording=None, workers=None):
+    from iconsdk.icon_service import IconService
+    from util.provider import GroupProvider, RateLimiter, RetryPolicy, SessionProvider
+
     endpoint_map = {
         "mainnet": ['https://ctz.solidwallet.io', 0x1],
         "lisbon":  ['https://lisbon.net.solidwallet.io', 0x2],
@@ -67,19 +153,55 @@ def get_icon_service(endpoint):
         "icon0":   ['http://localhost:9080', 0x3],
         "icon1":   ['http://localhost:9180', 0x101],
     }
+    # a group of nodes in the config file: reads go to the fastest healthy one, writes to the "write" node
+    config = load_endpoint_config()
+    group = config.get(endpoint, {})
+    # optional client-side limits for the endpoint: calls per second, burst and requests in flight
+    limits = dict((k, group[k]) for k in ('rate', 'burst', 'concurrency') if k in group)
+    # and the retries of the reads on the transient errors
+    retry = dict((k, group[k]) for k in ('retries', 'backoff') if k in group)
+    # a connection for each of the concurrent workers of the command
+    pool_size = max(SessionProvider.POOL_SIZE, workers) if workers else SessionProvider.POOL_SIZE
+    if recording is not None and recording.replay:
+        # no connection at all, the recorded responses are served in place of the node
+        if 'nodes' in group:
+            url, nid = group.get('write', group['nodes'][0]), group['nid']
+        else:
+            url, nid = endpoint_map.get(endpoint, [None, None])
+        if nid is None:
+            die(f'Error: unknown endpoint {endpoint}')
+        nid = int(nid, 16) if isinstance(nid, str) else nid
+        print('[Endpoint]')
+        print(f"{endpoint}: replaying {recording.path}")
+        provider = SessionProvider(url, 3, policy=RetryPolicy(0), recording=recording)
+        return IconService(provider), nid, provider
+    if 'nodes' in group:
+        provider = GroupProvider(group['nodes'], group.get('write'), group.get('hedge'), group.get('probe', 30),
+                                 limits=limits, policy=RetryPolicy(**retry), recording=recording, pool_size=pool_size)
+        nid = int(group['nid'], 16) if isinstance(group['nid'], str) else group['nid']
+        print('[Endpoint]')
+        for url in group['nodes']:
+            print(f"{endpoint}: {url}/api/v3")
+        print(f"{endpoint} (write): {provider.url}/api/v3")
+        return IconService(provider), nid, provider
     url, nid = endpoint_map.get(endpoint, [None, None])
     if not url:
-        die(f'Error: supported endpoints: {list(endpoint_map.keys())}')
+        groups = [name for name, value in config.items() if 'nodes' in value]
+        die(f'Error: supported endpoints: {list(endpoint_map.keys()) + groups}')
     print('[Endpoint]')
     print(f"{endpoint}: {url}/api/v3")
-    return IconService(HTTPProvider(url, 3)), nid
+    provider = SessionProvider(url, 3, pool_size=pool_size, limiter=RateLimiter(**limits), policy=RetryPolicy(**retry),
+                               recording=recording)
+    return IconService(provider), nid, provider
+
+
+TRACKER_PREFIXES = {
+    0x1: 'https://tracker.icon.community',
+    0x2: 'https://tracker.lisbon.icon.community',
+    0x3: 'http://localhost',
+    0x7: 'https://tracker.berlin.icon.community',
+}
 
 
 def get_tracker_prefix(nid):
-    tracker_map = {
-        0x1: 'https://tracker.icon.community',
-        0x2: 'https://tracker.lisbon.icon.community',
-        0x3: 'http://localhost',
-        0x7: 'https://tracker.berlin.icon.community',
-    }
-    return tracker_map.get(nid, None)
+    return TRACKER_PREFIXES.get(nid, None)
@@ -0,0 +1,107 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class ImmutableCache(object):
+
+    # the results pinned to a block height never change, so they are kept without expiry
+    def __init__(self, path=None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            with open(path, 'r') as f:
+                self._entries = json.load(f)
+
+    @staticmethod
+    def path_of(path, endpoint):
+        # a file for each endpoint, e.g. iscore.cache -> iscore.mainnet.cache
+        root, ext = os.path.splitext(path)
+        return f'{root}.{endpoint}{ext}'
+
+    @staticmethod
+    def key(*parts):
+        return json.dumps(parts, sort_keys=True, separators=(',', ':'))
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._dirty = True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def save(self):
+        if self._path is None or not self._dirty:
+            return
+        with self._lock:
+            tmp_path = self._path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self._path)
+            self._dirty = False
+
+
+class BoundedCache(object):
+
+    # the least recently used entries are dropped over the limit
+    def __init__(self, max_entries):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key, value):
+        # only if the entry was not replaced in the meantime
+        with self._lock:
+            if self._entries.get(key) is value:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import argparse
+from decimal import Decimal, InvalidOperation
 
 
 def address_type(string):
@@ -26,6 +27,31 @@ def address_type(string):
     raise argparse.ArgumentTypeError(f"Invalid address: '{string}'")
 
 
+def address_list_type(string):
+    return [address_type(a.strip()) for a in string.split(',') if len(a.strip()) > 0]
+
+
+def positive_int_type(string):
+    try:
+        value = int(string)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"should be a positive integer: '{string}'")
+    return value
+
+
+def icx_amount_type(string):
+    # an amount in ICX to loop without the float rounding
+    try:
+        value = Decimal(string)
+    except InvalidOperation:
+        value = Decimal(-1)
+    if not value.is_finite() or value < 0:
+        raise argparse.ArgumentTypeError(f"Invalid amount: '{string}'")
+    return int(value * 10 ** 18)
+
+
 def tx_hash_type(string):
     if isinstance(string, str) and len(string) == 66:
         prefix = string[:2]
@@ -35,3 +61,22 @@ def tx_hash_type(string):
             if str(string) == prefix + tx_hash:
                 return string
     raise argparse.ArgumentTypeError(f"Invalid txHash: '{string}'")
+
+
+def read_addresses(path):
+    from util import die
+    # in the order of the file without the duplicates
+    addresses = {}
+    with open(path, "r") as f:
+        for number, line in enumerate(f, 1):
+            line = line.split('#')[0].strip()
+            if len(line) == 0:
+                continue
+            try:
+                address = address_type(line)
+            except (argparse.ArgumentTypeError, ValueError):
+                die(f"Error: invalid address in {path} at line {number}: '{line}'")
+            addresses[address] = None
+    if len(addresses) == 0:
+        die(f'Error: no address in {path}')
+    return list(addresses)
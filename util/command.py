@@ -0,0 +1,130 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import importlib
+
+from util.output import Output
+
+# command name -> (module, help)
+COMMANDS = {
+    'gov': ('score.gov', 'Check governance status'),
+    'audit': ('score.audit', 'Perform audit operations'),
+    'inspect': ('util.inspect', 'Perform inspect operations'),
+    'icx': ('icx.icx', 'ICX operations'),
+    'token': ('score.token', 'Token (IRC2) operations'),
+    'iscore': ('iiss.iscore', 'Query and claim IScore'),
+    'stake': ('iiss.stake', 'Query and set staking'),
+    'delegate': ('iiss.delegate', 'Query and set delegations'),
+    'info': ('iiss.info', 'Query IISS Information'),
+    'prep': ('iiss.prep', 'P-Rep management'),
+    'portfolio': ('iiss.portfolio', 'Query balances of multiple addresses'),
+    'scan': ('util.scanner', 'Scan blocks and transactions'),
+    'baln': ('score.baln', '[SCORE] Balanced'),
+    'sicx': ('score.sicx', '[SCORE] Staked ICX'),
+    'cft': ('score.cft', '[SCORE] CraftNetwork'),
+    'omm': ('score.omm', '[SCORE] OMM Finance'),
+    'gbet': ('score.gbet', '[SCORE] GangstaBet'),
+    'serve': ('util.serve', 'Serve commands over a local JSON API'),
+}
+
+
+# the network client and the keystore are created on first use
+class CommandArgs(argparse.Namespace):
+
+    @property
+    def txhandler(self):
+        if self.__dict__.get('_txhandler') is None:
+            self._txhandler = self.create_txhandler()
+            # only the handler created here is closed with the command
+            self._own_txhandler = True
+        return self._txhandler
+
+    @txhandler.setter
+    def txhandler(self, value):
+        self._txhandler = value
+
+    def create_txhandler(self):
+        from util import get_icon_service
+        from util.txhandler import TxHandler
+        tx_handler = TxHandler(*get_icon_service(self.endpoint, self.recording, getattr(self, 'workers', None)))
+        if self.cache:
+            from util.cache import ImmutableCache
+            tx_handler.cache = ImmutableCache(ImmutableCache.path_of(self.cache, self.endpoint))
+        return tx_handler
+
+    @property
+    def recording(self):
+        if self.__dict__.get('_recording') is None and (self.record or self.replay):
+            from util.recording import Recording
+            self._recording = Recording(self.replay, True) if self.replay else Recording(self.record)
+        return self.__dict__.get('_recording')
+
+    @property
+    def keystore(self):
+        if self.__dict__.get('_keystore') is None:
+            from util.keystore import Keystore
+            self._keystore = Keystore(self.keystore_file, self.password)
+        return self._keystore
+
+    @keystore.setter
+    def keystore(self, value):
+        self._keystore = value
+
+    def close(self):
+        if self.__dict__.get('_txhandler') is not None:
+            self._txhandler.cache.save()
+            if self.stats:
+                from util.metrics import print_stats
+                print_stats(self._txhandler)
+            if self.__dict__.get('_own_txhandler'):
+                self._txhandler.close()
+        if self.__dict__.get('_recording') is not None:
+            self._recording.close()
+
+
+def create_parser(cmd, selected=None, parser_class=argparse.ArgumentParser):
+    parser = parser_class()
+    parser.add_argument('-e', '--endpoint', type=str, default="mainnet", help='an endpoint for connection')
+    parser.add_argument('-k', '--keystore', type=argparse.FileType('r'), dest='keystore_file', metavar='KEYSTORE',
+                        help='keystore file for creating transactions')
+    parser.add_argument('-p', '--password', type=str, help='password for the keystore file')
+    parser.add_argument('-o', '--output', type=str, default='text', choices=Output.FORMATS,
+                        help='output format')
+    parser.add_argument('--cache', type=str, metavar='FILE',
+                        help='file to keep the height-pinned query results across runs')
+    parser.add_argument('--stats', action='store_true',
+                        help='print the request counts, sizes and latencies at exit')
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument('--record', type=str, metavar='FILE',
+                           help='write the JSON-RPC requests and responses of the run to the file')
+    recording.add_argument('--replay', type=str, metavar='FILE',
+                           help='answer the JSON-RPC requests from the recorded file without a node')
+
+    subparsers = parser.add_subparsers(title='Available commands', metavar='command')
+    subparsers.required = True
+    subparsers.dest = 'command'
+
+    # only the selected command loads its module, the others are declared by name
+    for name, (module, _help) in COMMANDS.items():
+        if name == selected:
+            importlib.import_module(module).add_parser(cmd, subparsers)
+        else:
+            subparsers.add_parser(name, help=_help, add_help=False)
+    return parser
+
+
+def parse_args(cmd, argv=None):
+    args, _ = create_parser(cmd).parse_known_args(argv)
+    return create_parser(cmd, args.command).parse_args(argv, namespace=CommandArgs())
@@ -0,0 +1,210 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+
+from iconsdk.exception import JSONRPCException
+
+from util import die, emit, in_icx, is_text_output
+from util.scanner import BlockScanner, TxFilter
+from util.txhandler import TxHandler
+
+
+class EventIndex(object):
+
+    # events are appended as JSON lines followed by a checkpoint line,
+    # anything after the last checkpoint is an unfinished write and dropped on load
+    def __init__(self, path):
+        self._path = path
+        self._events = []
+        self._by_address = {}
+        self._heights = {}
+        self.last_height = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self._path):
+            return
+        events = []
+        offset = valid = 0
+        with open(self._path, 'rb') as f:
+            for line in f:
+                offset += len(line)
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    break
+                if 'checkpoint' in item:
+                    for event in events:
+                        self._add(event)
+                    events = []
+                    self.last_height = item['checkpoint']
+                    valid = offset
+                else:
+                    events.append(item)
+        if valid < os.path.getsize(self._path):
+            with open(self._path, 'r+b') as f:
+                f.truncate(valid)
+
+    def _add(self, event):
+        i = len(self._events)
+        self._events.append(event)
+        for address in {event.get('address'), event.get('from'), event.get('to')} - {None}:
+            self._by_address.setdefault(address, []).append(i)
+            self._heights.setdefault(address, []).append(event['height'])
+
+    def __len__(self):
+        return len(self._events)
+
+    def append(self, events, height):
+        with open(self._path, 'a') as f:
+            for event in events:
+                f.write(json.dumps(event) + '\n')
+            f.write(json.dumps({'checkpoint': height}) + '\n')
+        for event in events:
+            self._add(event)
+        self.last_height = height
+
+    def query(self, address, types=None, score=None, start=None, end=None):
+        indexes = self._by_address.get(address, [])
+        heights = self._heights.get(address, [])
+        lo = bisect_left(heights, start) if start is not None else 0
+        hi = bisect_right(heights, end) if end is not None else len(heights)
+        events = []
+        for i in indexes[lo:hi]:
+            event = self._events[i]
+            if types is not None and event['type'] not in types:
+                continue
+            if score is not None and event.get('score') != score:
+                continue
+            events.append(event)
+        return events
+
+
+class EventIndexer(object):
+    CHAIN_METHODS = {
+        'setStake': 'stake',
+        'setDelegation': 'delegation',
+        'setBond': 'bond',
+        'claimIScore': 'claim',
+    }
+    TRANSFER_SIG = 'Transfer(Address,Address,int,bytes)'
+    CLAIM_SIG = 'IScoreClaimedV2(Address,int,int)'
+    FLUSH_SIZE = TxHandler.BATCH_LIMIT * TxHandler.MAX_WORKERS
+    CHECKPOINT_INTERVAL = 1000
+
+    def __init__(self, tx_handler: TxHandler, index: EventIndex, tx_filter=None, prefetch=BlockScanner.PREFETCH):
+        self._tx_handler = tx_handler
+        self._index = index
+        self._filter = tx_filter if tx_filter else TxFilter()
+        self._scanner = BlockScanner(tx_handler, prefetch=prefetch)
+
+    def _is_candidate(self, tx):
+        to = tx.get('to', '')
+        if not self._filter.match(tx) or tx.get('dataType') != 'call':
+            return False
+        if to == TxHandler.SYSTEM_ADDRESS:
+            return TxFilter.method(tx) in self.CHAIN_METHODS
+        return to.startswith('cx')
+
+    def _extract(self, height, tx, result):
+        base = {
+            'height': height,
+            'txHash': tx.get('txHash', tx.get('tx_hash')),
+            'timestamp': int(tx.get('timestamp', '0x0'), 16),
+        }
+        events = []
+        logs = result.get('eventLogs', [])
+        if tx['to'] == TxHandler.SYSTEM_ADDRESS:
+            _type = self.CHAIN_METHODS[TxFilter.method(tx)]
+            params = tx['data'].get('params', {})
+            event = {**base, 'type': _type, 'address': tx['from']}
+            if _type == 'stake':
+                event['value'] = int(params.get('value', '0x0'), 16)
+            elif _type in ('delegation', 'bond'):
+                event[_type + 's'] = [{'address': d['address'], 'value': int(d['value'], 16)}
+                                      for d in params.get(_type + 's', [])]
+            else:
+                claimed = [log for log in logs if log['indexed'][0] == self.CLAIM_SIG]
+                event['iscore'] = int(claimed[0]['data'][0], 16) if claimed else None
+                event['value'] = int(claimed[0]['data'][1], 16) if claimed else None
+            events.append(event)
+        for log in logs:
+            indexed = log['indexed']
+            if indexed[0] == self.TRANSFER_SIG and len(indexed) == 4:
+                events.append({**base, 'type': 'transfer', 'score': log['scoreAddress'],
+                               'from': indexed[1], 'to': indexed[2], 'value': int(indexed[3], 16)})
+        return events
+
+    def _flush(self, pending, height):
+        requests = [('icx_getTransactionResult', {'txHash': tx.get('txHash', tx.get('tx_hash'))})
+                    for _, tx in pending]
+        events = []
+        for (tx_height, tx), result in zip(pending, self._tx_handler.batch(requests)):
+            if isinstance(result, JSONRPCException):
+                raise result
+            if result.get('status') == '0x1':
+                events.extend(self._extract(tx_height, tx, result))
+        self._index.append(events, height)
+        return len(events)
+
+    def run(self, start=None, end=None):
+        if start is None:
+            if self._index.last_height is None:
+                die('Error: start height should be specified for the new index')
+            start = self._index.last_height + 1
+        elif self._index.last_height is not None and start <= self._index.last_height:
+            # the blocks already indexed would append their events again
+            print(f'Blocks up to {self._index.last_height} are already indexed, starting from the next one')
+            start = self._index.last_height + 1
+        if end is not None and start > end:
+            return 0
+        pending = []
+        count = 0
+        last = flushed = None
+        for height, block in self._scanner.blocks(start, end):
+            for tx in block.get('confirmed_transaction_list', []):
+                if self._is_candidate(tx):
+                    pending.append((height, tx))
+            last = height
+            if len(pending) >= self.FLUSH_SIZE or height - (flushed or start) >= self.CHECKPOINT_INTERVAL:
+                count += self._flush(pending, height)
+                pending = []
+                flushed = height
+        if last is not None and last != flushed:
+            count += self._flush(pending, last)
+        return count
+
+
+def print_history(index, address, types, score=None):
+    events = index.query(address, types, score)
+    if not is_text_output():
+        for event in events:
+            emit('event', event)
+        return
+    print(f'\n[History of "{address}"] (indexed up to {index.last_height})')
+    for e in events:
+        if e['type'] in ('delegation', 'bond'):
+            items = e[e['type'] + 's']
+            detail = ', '.join(f"{d['address']}={in_icx(d['value'])}" for d in items) if items else 'cleared'
+        elif e['type'] == 'transfer':
+            detail = f"{e['from']} -> {e['to']} {in_icx(e['value'])} ({e['score']})"
+        elif e['value'] is None:
+            detail = '-'
+        else:
+            detail = f"{in_icx(e['value'])} ICX"
+        print(f"{e['height']}: {e['type']:10s} {detail}")
+    print('>>> Count:', len(events))
@@ -18,9 +18,7 @@ import subprocess
 import tempfile
 import zipfile
 
-from iiss.prep import PRep
-from score.gov import Governance
-from util import die
+from util import die, emit
 from util.checks import address_type
 
 
@@ -33,25 +31,38 @@ class Inspect(object):
         self._check_type = "prep.delegated"
 
     def download_contract(self, json_file):
+        from iconsdk.exception import JSONRPCException
+        from score.chain import ChainScore
         with open(json_file, "r") as f:
             contracts: dict = json.loads(f.read())
-        gov = Governance(self._tx_handler)
         tempdir = tempfile.mkdtemp(prefix="download-", dir=".")
-        for address in contracts.keys():
-            print(address)
-            status = gov.get_score_status(address)
+        # fetch all the statuses and then all the deploy transactions in batches
+        addresses = list(contracts.keys())
+        statuses = self._tx_handler.call_many([(ChainScore.ADDRESS, "getScoreStatus", {"address": address}, None)
+                                               for address in addresses])
+        for status in statuses:
+            if isinstance(status, JSONRPCException):
+                raise status
+        targets = {}
+        for address, status in zip(addresses, statuses):
             current = status['current']
+            if status['owner'].startswith("hx") and current['deployTxHash'] == current['auditTxHash']:
+                targets[address] = current['deployTxHash']
+        txs = dict(zip(targets.keys(), self._tx_handler.get_txs_by_hash(list(targets.values()))))
+        for address, status in zip(addresses, statuses):
+            print(address)
             owner = status['owner']
-            if owner.startswith("hx") and current['deployTxHash'] == current['auditTxHash']:
-                tx_hash = current['deployTxHash']
-                result = self._tx_handler.get_tx_by_hash(tx_hash)
-                if 'result' in result:
-                    raw_tx = result['result']
+            if address in targets:
+                tx_hash = targets[address]
+                raw_tx = txs[address]
+                if not isinstance(raw_tx, JSONRPCException):
                     content = bytes.fromhex(raw_tx['data']['content'][2:])
                     filename = f"{address}_{tx_hash[2:8]}.jar"
                     with open(os.path.join(tempdir, filename), 'wb') as dest:
                         dest.write(content)
                     print('Downloaded', filename)
+                    emit('download', {'address': address, 'txHash': tx_hash,
+                                      'path': os.path.join(tempdir, filename)})
                 else:
                     die('Error: failed to get transaction data')
             else:
@@ -95,6 +106,8 @@ class Inspect(object):
                         print(f"\tFound: {code_jar}/{f.filename}")
                         print(f"\t\tat {cf}")
                         print(f"\t\t{ret.stdout[idx:idx2]}")
+                        emit('found', {'jar': code_jar, 'class': f.filename, 'path': cf,
+                                       'match': ret.stdout[idx:idx2].decode(errors='replace')})
                         purge_tmpdir = False
                     else:
                         os.remove(cf)
@@ -146,9 +159,11 @@ class Inspect(object):
                     old = ret
         ret = self.check(address, low)
         print(f">>> END: height({low}) ret({ret})")
+        emit('bisect', {'address': address, 'checkType': self._check_type, 'height': low, 'value': ret})
 
     def check(self, address, height):
         if self._check_type.startswith("prep"):
+            from iiss.prep import PRep
             prep = PRep(self._tx_handler).get_prep(address, height)
             subtype = self._check_type.split('.')[1]
             if subtype == "delegated":
@@ -181,13 +196,16 @@ def add_parser(cmd, subparsers):
 
 
 def run(args):
-    inspect = Inspect(args.txhandler, args.keystore, args.endpoint)
     json_file = args.download
     if json_file:
+        inspect = Inspect(args.txhandler, args.keystore, args.endpoint)
         inspect.download_contract(json_file)
     elif args.bisect:
         if not args.address:
             die("Error: address is required")
+        inspect = Inspect(args.txhandler, args.keystore, args.endpoint)
         inspect.start_bisect(args.bisect, args.address)
     else:
+        # local-only operation, no need to connect to the endpoint
+        inspect = Inspect(None, None, args.endpoint)
         inspect.run(args)
@@ -12,13 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import getpass
 import json
 
 from iconsdk.exception import KeyStoreException
 from iconsdk.wallet.wallet import KeyWallet
 
-from util import die
+from util import die, get_password
 
 
 class Keystore:
@@ -27,6 +26,7 @@ class Keystore:
         self._keystore = keystore
         self._passwd = passwd
         self._address = None
+        self._wallet = None
 
     @property
     def address(self):
@@ -42,13 +42,24 @@ class Keystore:
             keyfile: dict = json.load(f)
             return keyfile.get('address')
 
+    @property
+    def path(self):
+        return self._keystore.name if self._keystore else None
+
+    @property
+    def unlocked(self):
+        return self._wallet is not None
+
     def get_wallet(self):
+        if self._wallet is not None:
+            return self._wallet
         if not self._keystore:
             die('Error: keystore should be specified')
         try:
             passwd = self._passwd
             if passwd is None:
-                passwd = getpass.getpass()
-            return KeyWallet.load(self._keystore.name, passwd)
+                passwd = get_password()
+            self._wallet = KeyWallet.load(self._keystore.name, passwd)
+            return self._wallet
         except KeyStoreException as e:
             die(e.message)
@@ -0,0 +1,166 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import threading
+from bisect import bisect_left
+
+
+class Histogram(object):
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    RESERVOIR = 1024
+
+    # fixed buckets for the export, and a uniform sample of the values for the percentiles
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._samples = []
+
+    def observe(self, value):
+        self.counts[bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if len(self._samples) < self.RESERVOIR:
+            self._samples.append(value)
+        else:
+            i = random.randrange(self.count)
+            if i < self.RESERVOIR:
+                self._samples[i] = value
+
+    def percentile(self, p):
+        if len(self._samples) == 0:
+            return 0.0
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+
+class MethodStats(object):
+
+    def __init__(self):
+        self.requests = 0
+        self.calls = 0
+        self.errors = 0
+        self.sent = 0
+        self.received = 0
+        self.latency = Histogram()
+
+
+class Metrics(object):
+
+    # the requests are recorded by the JSON-RPC method, or as "batch" for the mixed batches
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods = {}
+
+    @staticmethod
+    def method_name(data):
+        if isinstance(data, list):
+            methods = set(item['method'] for item in data)
+            return methods.pop() if len(methods) == 1 else 'batch'
+        return data['method']
+
+    def record(self, method, calls, latency, sent, received, errors=0):
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = MethodStats()
+            stats.requests += 1
+            stats.calls += calls
+            stats.errors += errors
+            stats.sent += sent
+            stats.received += received
+            stats.latency.observe(latency)
+
+    def snapshot(self):
+        with self._lock:
+            return sorted(self._methods.items())
+
+
+def _size(value):
+    for unit in ('B', 'KB', 'MB'):
+        if value < 1024:
+            return f'{value:.0f}{unit}' if unit == 'B' else f'{value:.1f}{unit}'
+        value /= 1024
+    return f'{value:.1f}GB'
+
+
+def print_stats(tx_handler):
+    from util import emit, is_text_output
+    rows = tx_handler.metrics.snapshot()
+    if not is_text_output():
+        for method, s in rows:
+            emit('stats', {'method': method, 'calls': s.calls, 'requests': s.requests, 'errors': s.errors,
+                           'sent': s.sent, 'received': s.received,
+                           'p50': s.latency.percentile(50), 'p95': s.latency.percentile(95),
+                           'p99': s.latency.percentile(99)})
+        emit('cache', {'hits': tx_handler.cache.hits, 'misses': tx_handler.cache.misses})
+        emit('retries', dict(tx_handler.retries))
+        return
+    print('\n[Stats]')
+    print(f"{'method':32s} {'calls':>7s} {'reqs':>6s} {'errors':>6s} {'sent':>8s} {'recv':>8s} "
+          f"{'p50(ms)':>8s} {'p95(ms)':>8s} {'p99(ms)':>8s}")
+    for method, s in rows:
+        p50, p95, p99 = (s.latency.percentile(p) * 1000 for p in (50, 95, 99))
+        print(f'{method:32s} {s.calls:7d} {s.requests:6d} {s.errors:6d} {_size(s.sent):>8s} {_size(s.received):>8s} '
+              f'{p50:8.1f} {p95:8.1f} {p99:8.1f}')
+    elapsed = sum(s.latency.sum for _, s in rows)
+    print(f'>>> Requests: {sum(s.requests for _, s in rows)}, time in requests: {elapsed:.3f}s')
+    cache = tx_handler.cache
+    lookups = cache.hits + cache.misses
+    if lookups > 0:
+        print(f'>>> Cache: {cache.hits} hits, {cache.misses} misses ({100 * cache.hits / lookups:.1f}%)')
+    retries = tx_handler.retries
+    if sum(retries.values()) > 0:
+        print('>>> Retries:', ', '.join(f'{kind} {count}' for kind, count in retries.items() if count > 0))
+
+
+def prometheus_text(tx_handlers):
+    # tx_handlers: endpoint -> TxHandler, exported in the Prometheus text format
+    families = {
+        'icon_rpc_requests_total': ('counter', 'HTTP requests sent to the node', []),
+        'icon_rpc_calls_total': ('counter', 'JSON-RPC calls including the ones in batches', []),
+        'icon_rpc_errors_total': ('counter', 'JSON-RPC calls failed', []),
+        'icon_rpc_sent_bytes_total': ('counter', 'bytes of the request bodies', []),
+        'icon_rpc_received_bytes_total': ('counter', 'bytes of the response bodies', []),
+        'icon_rpc_latency_seconds': ('histogram', 'latency of the HTTP requests', []),
+        'icon_rpc_retries_total': ('counter', 'reads sent again by the error class', []),
+        'icon_cache_hits_total': ('counter', 'query results found in the cache', []),
+        'icon_cache_misses_total': ('counter', 'query results not found in the cache', []),
+    }
+    for endpoint, tx_handler in sorted(tx_handlers.items()):
+        for method, s in tx_handler.metrics.snapshot():
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            families['icon_rpc_requests_total'][2].append(f'{{{labels}}} {s.requests}')
+            families['icon_rpc_calls_total'][2].append(f'{{{labels}}} {s.calls}')
+            families['icon_rpc_errors_total'][2].append(f'{{{labels}}} {s.errors}')
+            families['icon_rpc_sent_bytes_total'][2].append(f'{{{labels}}} {s.sent}')
+            families['icon_rpc_received_bytes_total'][2].append(f'{{{labels}}} {s.received}')
+            samples = families['icon_rpc_latency_seconds'][2]
+            cumulative = 0
+            for bound, count in zip(Histogram.BUCKETS + ('+Inf',), s.latency.counts):
+                cumulative += count
+                samples.append(f'_bucket{{{labels},le="{bound}"}} {cumulative}')
+            samples.append(f'_sum{{{labels}}} {s.latency.sum}')
+            samples.append(f'_count{{{labels}}} {s.latency.count}')
+        for kind, count in tx_handler.retries.items():
+            families['icon_rpc_retries_total'][2].append(f'{{endpoint="{endpoint}",kind="{kind}"}} {count}')
+        families['icon_cache_hits_total'][2].append(f'{{endpoint="{endpoint}"}} {tx_handler.cache.hits}')
+        families['icon_cache_misses_total'][2].append(f'{{endpoint="{endpoint}"}} {tx_handler.cache.misses}')
+    lines = []
+    for name, (_type, _help, samples) in families.items():
+        lines.append(f'# HELP {name} {_help}')
+        lines.append(f'# TYPE {name} {_type}')
+        lines.extend(name + sample for sample in samples)
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,89 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import json
+
+
+class Output(object):
+    FORMATS = ['text', 'json', 'ndjson', 'csv']
+
+    def __init__(self, fmt='text', stream=None):
+        if fmt not in self.FORMATS:
+            raise ValueError(f'Error: supported output formats: {self.FORMATS}')
+        self._format = fmt
+        self._stream = stream
+        self._records = []
+
+    @property
+    def format(self):
+        return self._format
+
+    @property
+    def is_text(self):
+        return self._format == 'text'
+
+    @property
+    def records(self):
+        return self._records
+
+    def emit(self, header, record):
+        if self.is_text:
+            return
+        from util import convert
+        data = convert(record, human=False)
+        item = {'record': header}
+        if isinstance(data, dict):
+            item.update(data)
+        else:
+            item['value'] = data
+        if self._format == 'ndjson' and self._stream is not None:
+            self._stream.write(json.dumps(item) + '\n')
+            self._stream.flush()
+        else:
+            self._records.append(item)
+
+    def close(self):
+        if self._stream is None or len(self._records) == 0:
+            return
+        if self._format == 'json':
+            self._stream.write(json.dumps(self._records, indent=2) + '\n')
+        elif self._format == 'csv':
+            self._write_csv()
+        self._stream.flush()
+        self._records = []
+
+    def _write_csv(self):
+        rows = [self._flatten(item) for item in self._records]
+        fieldnames = []
+        for row in rows:
+            for key in row.keys():
+                if key not in fieldnames:
+                    fieldnames.append(key)
+        writer = csv.DictWriter(self._stream, fieldnames=fieldnames, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    @classmethod
+    def _flatten(cls, item, prefix=''):
+        row = {}
+        for k, v in item.items():
+            key = f'{prefix}{k}'
+            if isinstance(v, dict):
+                row.update(cls._flatten(v, key + '.'))
+            elif isinstance(v, list):
+                row[key] = json.dumps(v)
+            else:
+                row[key] = v
+        return row
@@ -0,0 +1,436 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import json
+import random
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from json.decoder import JSONDecodeError
+from time import monotonic, sleep
+
+import requests
+from iconsdk.exception import HTTPError, JSONRPCException
+from iconsdk.providers.provider import Provider
+
+from util.metrics import Metrics
+
+
+class RateLimiter(object):
+
+    # a token bucket for the calls per second and a cap on the requests in flight,
+    # the callers block until they are allowed, which throttles the parallel executors as well
+    def __init__(self, rate=None, burst=None, concurrency=None):
+        self._rate = rate
+        self._burst = max(1, burst if burst else rate if rate else 1)
+        self._tokens = self._burst
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+
+    def _take(self, count):
+        # a batch larger than the burst pays for all of its calls, a burst at a time
+        while count > self._burst:
+            self._take(self._burst)
+            count -= self._burst
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= count:
+                    self._tokens -= count
+                    return
+                delay = (count - self._tokens) / self._rate
+            sleep(delay)
+
+    @contextmanager
+    def limit(self, count=1):
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            if self._rate:
+                self._take(count)
+            yield
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+
+# the failures of a node itself, not the answers from it
+TRANSPORT_ERRORS = (requests.exceptions.RequestException, HTTPError)
+WRITE_METHODS = ('icx_sendTransaction', 'icx_sendTransactionAndWait')
+
+
+class RetryPolicy(object):
+    RETRYABLE = ('timeout', 'rate-limit', 'node-behind', 'server')
+    # the JSON-RPC error codes of goloop for the transient conditions
+    CODES = {
+        JSONRPCException.RPC_INTERNAL_ERROR: 'server',
+        JSONRPCException.SYSTEM_ERROR: 'server',
+        JSONRPCException.SYSTEM_POOL_OVERFLOW: 'rate-limit',
+        JSONRPCException.SYSTEM_LACK_OF_RESOURCE: 'rate-limit',
+        JSONRPCException.SYSTEM_REQUEST_TIMEOUT: 'timeout',
+        JSONRPCException.SYSTEM_HARD_TIMEOUT: 'timeout',
+    }
+
+    # only the reads are sent again, a transaction may have been accepted before the failure
+    def __init__(self, retries=2, backoff=0.5, max_backoff=8.0):
+        self._retries = max(0, retries)
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self.retries = dict((kind, 0) for kind in self.RETRYABLE)
+
+    @classmethod
+    def classify(cls, error, params=None):
+        if isinstance(error, requests.exceptions.Timeout):
+            return 'timeout'
+        if isinstance(error, requests.exceptions.RequestException):
+            return 'server'
+        if isinstance(error, HTTPError):
+            if error.status == 429:
+                return 'rate-limit'
+            return 'server' if error.status >= 500 else 'deterministic'
+        if isinstance(error, JSONRPCException):
+            if error.rpc_code == JSONRPCException.SYSTEM_TX_NOT_FOUND \
+                    and isinstance(params, dict) and 'height' in params:
+                # the height is not reached yet by this node
+                return 'node-behind'
+            return cls.CODES.get(error.rpc_code, 'deterministic')
+        return 'deterministic'
+
+    def _should_retry(self, kinds, attempt):
+        if 'deterministic' in kinds or attempt > self._retries:
+            return False
+        with self._lock:
+            for kind in kinds:
+                self.retries[kind] += 1
+        # exponential backoff with jitter to spread the parallel workers
+        sleep(min(self._max_backoff, self._backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0))
+        return True
+
+    def call(self, func, method=None, params=None):
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except TRANSPORT_ERRORS + (JSONRPCException,) as e:
+                attempt += 1
+                if method in WRITE_METHODS or not self._should_retry([self.classify(e, params)], attempt):
+                    raise
+
+    def call_batch(self, func, requests):
+        # the whole batch is sent again on the transport errors, then only the failed items
+        if any(method in WRITE_METHODS for method, _ in requests):
+            return func(requests)
+        results = self.call(lambda: func(requests))
+        attempt = 0
+        while True:
+            failed = [(i, self.classify(r, requests[i][1])) for i, r in enumerate(results)
+                      if isinstance(r, JSONRPCException)]
+            failed = [(i, kind) for i, kind in failed if kind != 'deterministic']
+            attempt += 1
+            if len(failed) == 0 or not self._should_retry([kind for _, kind in failed], attempt):
+                return results
+            retried = self.call(lambda: func([requests[i] for i, _ in failed]))
+            for (i, _), result in zip(failed, retried):
+                results[i] = result
+
+
+class SessionProvider(Provider):
+    HEADERS = {'Content-Type': 'application/json'}
+    POOL_SIZE = 32
+
+    def __init__(self, url, version=3, timeout=10, pool_size=POOL_SIZE, limiter=None, policy=None, metrics=None,
+                 recording=None):
+        self._url = url
+        self._version = version
+        self._timeout = timeout
+        self._limiter = limiter if limiter else RateLimiter()
+        self._policy = policy if policy else RetryPolicy()
+        self._metrics = metrics if metrics else Metrics()
+        self._recording = recording
+        # unlike HTTPProvider, keep one pooled session alive across the requests
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._ids = itertools.count(1)
+
+    def __str__(self):
+        return f"RPC connection to {self._url}"
+
+    @property
+    def url(self):
+        return self._url
+
+    @property
+    def policy(self):
+        return self._policy
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    def _rpc_url(self, method):
+        suffix = 'd' if method.startswith('debug_') else ''
+        return f'{self._url}/api/v{self._version}{suffix}'
+
+    def _make_rpc_dict(self, method, params):
+        rpc_dict = {
+            'jsonrpc': '2.0',
+            'method': method,
+            'id': next(self._ids)
+        }
+        if params:
+            rpc_dict['params'] = params
+        return rpc_dict
+
+    def _post(self, url, data):
+        # a batch counts as many calls as it has
+        calls = len(data) if isinstance(data, list) else 1
+        method = Metrics.method_name(data)
+        body = json.dumps(data)
+        with self._limiter.limit(calls):
+            # the time waiting for the limiter is not the latency of the node
+            start = monotonic()
+            try:
+                response = self._send(url, data, body)
+            except requests.exceptions.RequestException:
+                self._metrics.record(method, calls, monotonic() - start, len(body), 0, calls)
+                raise
+            latency = monotonic() - start
+        try:
+            content = json.loads(response.content)
+        except JSONDecodeError:
+            content = None
+        if content is None or (not response.ok and not isinstance(content, list) and 'error' not in content):
+            # not a JSON-RPC answer, but an error page from a proxy in front of the node
+            self._metrics.record(method, calls, latency, len(body), len(response.content), calls)
+            raise HTTPError(response.content.decode(), response.status_code)
+        if isinstance(content, list):
+            errors = sum(1 for item in content if 'error' in item)
+        else:
+            errors = 1 if 'error' in content else 0
+        self._metrics.record(method, calls, latency, len(body), len(response.content), errors)
+        return response, content
+
+    def _send(self, url, data, body):
+        # with a recording, the exchanges are written to it, or the recorded ones are served without the network
+        if self._recording is not None and self._recording.replay:
+            return self._recording.respond(data)
+        response = self._session.post(url, data=body, headers=self.HEADERS, timeout=self._timeout)
+        if self._recording is not None:
+            self._recording.record(data, response)
+        return response
+
+    def make_request(self, method, params=None, full_response=False):
+        return self._policy.call(lambda: self._request(method, params, full_response), method, params)
+
+    def _request(self, method, params=None, full_response=False):
+        rpc_dict = self._make_rpc_dict(method, params)
+        response, content = self._post(self._rpc_url(method), rpc_dict)
+        if full_response:
+            return content
+        if response.ok:
+            return content['result']
+        raise JSONRPCException(
+            content["error"]["message"],
+            content["error"]["code"],
+            content["error"].get("data", None),
+        )
+
+    def make_batch_request(self, requests):
+        # requests: a list of (method, params) sent as one JSON-RPC batch,
+        # returns the results in the same order with an exception for the failed ones
+        return self._policy.call_batch(self._batch, requests)
+
+    def _batch(self, requests):
+        rpc_list = [self._make_rpc_dict(method, params) for method, params in requests]
+        response, content = self._post(self._rpc_url(requests[0][0]), rpc_list)
+        if not isinstance(content, list):
+            # the server does not accept batch requests, fall back to the single requests
+            return [self._make_request_or_error(method, params) for method, params in requests]
+        responses = {item.get('id'): item for item in content}
+        results = []
+        for rpc_dict in rpc_list:
+            item = responses.get(rpc_dict['id'])
+            if item is None:
+                results.append(JSONRPCException('no response in the batch', JSONRPCException.RPC_INTERNAL_ERROR))
+            elif 'error' in item:
+                error = item['error']
+                results.append(JSONRPCException(error['message'], error['code'], error.get('data', None)))
+            else:
+                results.append(item['result'])
+        return results
+
+    def _make_request_or_error(self, method, params):
+        try:
+            return self._request(method, params)
+        except JSONRPCException as e:
+            return e
+
+    def make_monitor(self, spec, keep_alive=None):
+        raise NotImplementedError("SessionProvider does not support monitoring")
+
+    def close(self):
+        self._session.close()
+
+
+class GroupProvider(Provider):
+    WRITE_METHODS = WRITE_METHODS
+    MAX_BEHIND = 10  # blocks a node can lag behind the others before it is skipped
+
+    def __init__(self, urls, write_url=None, hedge=None, probe_interval=30, timeout=10, limits=None, policy=None,
+                 recording=None, pool_size=SessionProvider.POOL_SIZE):
+        # each node has its own limiter with the same limits, and the retries are done by the group
+        # after failing over all the nodes
+        limits = limits if limits else {}
+        self._metrics = Metrics()
+        self._nodes = [SessionProvider(url, timeout=timeout, pool_size=pool_size, limiter=RateLimiter(**limits),
+                                       policy=RetryPolicy(0), metrics=self._metrics, recording=recording)
+                       for url in urls]
+        self._write = next((n for n in self._nodes if n.url == write_url), None)
+        if self._write is None:
+            self._write = SessionProvider(write_url, timeout=timeout, pool_size=pool_size,
+                                          limiter=RateLimiter(**limits), policy=RetryPolicy(0), metrics=self._metrics,
+                                          recording=recording) \
+                if write_url else self._nodes[0]
+        self._policy = policy if policy else RetryPolicy()
+        self._hedge = hedge
+        self._lock = threading.Lock()
+        self._latency = dict((node, 0.0) for node in self._nodes)
+        self._healthy = dict((node, True) for node in self._nodes)
+        self._executor = ThreadPoolExecutor(4 * len(self._nodes))
+        self._closed = threading.Event()
+        self.probe()
+        if probe_interval:
+            threading.Thread(target=self._probe_loop, args=(probe_interval,), daemon=True).start()
+
+    def __str__(self):
+        return f"RPC connection to {[n.url for n in self._nodes]} (write: {self._write.url})"
+
+    @property
+    def url(self):
+        return self._write.url
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+    @property
+    def policy(self):
+        return self._policy
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    def _record(self, node, latency):
+        with self._lock:
+            self._healthy[node] = latency is not None
+            if latency is not None:
+                # moving average, the first sample replaces the initial zero
+                prev = self._latency[node]
+                self._latency[node] = latency if prev == 0 else 0.7 * prev + 0.3 * latency
+
+    def probe(self):
+        def _probe(node):
+            start = monotonic()
+            try:
+                return node.make_request('icx_getLastBlock')['height'], monotonic() - start
+            except TRANSPORT_ERRORS + (JSONRPCException,):
+                return None, None
+
+        results = list(self._executor.map(_probe, self._nodes))
+        heights = [h for h, _ in results if h is not None]
+        top = max(heights) if heights else 0
+        for node, (height, latency) in zip(self._nodes, results):
+            self._record(node, latency if height is not None and height >= top - self.MAX_BEHIND else None)
+
+    def _probe_loop(self, interval):
+        while not self._closed.wait(interval):
+            self.probe()
+
+    def close(self):
+        self._closed.set()
+        self._executor.shutdown(wait=False)
+        for node in set(self._nodes + [self._write]):
+            node.close()
+
+    def _candidates(self):
+        with self._lock:
+            return sorted(self._nodes, key=lambda n: (not self._healthy[n], self._latency[n]))
+
+    @staticmethod
+    def _failed(result, params=None):
+        # the errors another node may not have, the node is skipped until the next probe
+        if isinstance(result, list):
+            return any(GroupProvider._failed(r, p) for r, (_, p) in zip(result, params))
+        if isinstance(result, TRANSPORT_ERRORS):
+            return True
+        return isinstance(result, JSONRPCException) and RetryPolicy.classify(result, params) in RetryPolicy.RETRYABLE
+
+    def _call(self, node, func, params=None):
+        start = monotonic()
+        try:
+            result = func(node)
+        except TRANSPORT_ERRORS + (JSONRPCException,) as e:
+            self._record(node, None if self._failed(e, params) else monotonic() - start)
+            raise
+        self._record(node, None if self._failed(result, params) else monotonic() - start)
+        return result
+
+    def _read(self, func, params=None):
+        # the fastest healthy node first, then fail over to the others;
+        # with hedging, the second one is also asked if the first one is slow
+        candidates = self._candidates()
+        error = None
+        if self._hedge and len(candidates) > 1:
+            futures = [self._executor.submit(self._call, candidates[0], func, params)]
+            done, _ = wait(futures, timeout=self._hedge)
+            if len(done) == 0:
+                futures.append(self._executor.submit(self._call, candidates[1], func, params))
+            pending = set(futures)
+            while len(pending) > 0:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    if error is None or not self._failed(error, params):
+                        return future.result()
+            candidates = candidates[len(futures):]
+        for node in candidates:
+            try:
+                return self._call(node, func, params)
+            except TRANSPORT_ERRORS + (JSONRPCException,) as e:
+                if not self._failed(e, params):
+                    raise
+                error = e
+        raise error
+
+    def make_request(self, method, params=None, full_response=False):
+        if method in self.WRITE_METHODS:
+            return self._write.make_request(method, params, full_response)
+        return self._policy.call(lambda: self._read(lambda node: node.make_request(method, params, full_response),
+                                                    params), method, params)
+
+    def make_batch_request(self, requests):
+        # a node failing some items of the batch is skipped when the policy sends them again
+        return self._policy.call_batch(lambda items: self._read(lambda node: node.make_batch_request(items), items),
+                                       requests)
+
+    def make_monitor(self, spec, keep_alive=None):
+        raise NotImplementedError("GroupProvider does not support monitoring")
@@ -0,0 +1,112 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+from collections import deque
+from json.decoder import JSONDecodeError
+
+from iconsdk.exception import HTTPError
+
+
+class RecordedResponse(object):
+
+    def __init__(self, status_code, content):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+
+class Recording(object):
+    # the signed fields change on every run, the transactions are matched without them
+    VOLATILE_METHODS = ('icx_sendTransaction', 'icx_sendTransactionAndWait', 'debug_estimateStep')
+    VOLATILE_PARAMS = ('timestamp', 'signature')
+
+    # the request and response pairs are kept as JSON lines without the ids, so a replay matches
+    # the same requests of another run; the same request answered differently (e.g. polling) is replayed in order
+    def __init__(self, path, replay=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self.replay = replay
+        self._entries = {}
+        self._file = None
+        if replay:
+            with open(path, 'r') as f:
+                for line in f:
+                    entry = json.loads(line)
+                    self._entries.setdefault(self.key(entry['request']), deque()).append(entry)
+        else:
+            self._file = open(path, 'w')
+
+    @classmethod
+    def _strip(cls, data):
+        if isinstance(data, list):
+            return [cls._strip(item) for item in data]
+        item = dict((k, v) for k, v in data.items() if k != 'id')
+        if item.get('method') in cls.VOLATILE_METHODS and isinstance(item.get('params'), dict):
+            item['params'] = dict((k, v) for k, v in item['params'].items() if k not in cls.VOLATILE_PARAMS)
+        return item
+
+    @classmethod
+    def key(cls, data):
+        return json.dumps(cls._strip(data), sort_keys=True, separators=(',', ':'))
+
+    @staticmethod
+    def _drop_id(item):
+        if not isinstance(item, dict):
+            return item
+        return dict((k, v) for k, v in item.items() if k != 'id')
+
+    def record(self, data, response):
+        entry = {'request': self._strip(data), 'status': response.status_code}
+        try:
+            content = json.loads(response.content)
+        except JSONDecodeError:
+            content = None
+        if content is None:
+            entry['text'] = response.content.decode()
+        elif isinstance(data, list) and isinstance(content, list):
+            # in the order of the requests, the ids are given again on replay
+            by_id = dict((item.get('id'), item) for item in content)
+            entry['response'] = [self._drop_id(by_id.get(item['id'])) for item in data]
+        else:
+            entry['response'] = self._drop_id(content)
+        with self._lock:
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+
+    def respond(self, data):
+        with self._lock:
+            entries = self._entries.get(self.key(data))
+            if not entries:
+                method = data[0]['method'] if isinstance(data, list) else data['method']
+                raise HTTPError(f'no recorded response for {method} in {self.path}', 404)
+            # the last answer is repeated once the recorded ones are used up
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+        if 'text' in entry:
+            return RecordedResponse(entry['status'], entry['text'].encode())
+        content = entry['response']
+        if isinstance(data, list) and isinstance(content, list):
+            content = [dict(r, id=item['id']) for item, r in zip(data, content) if r is not None]
+        elif isinstance(data, dict) and isinstance(content, dict):
+            content = dict(content, id=data['id'])
+        return RecordedResponse(entry['status'], json.dumps(content).encode())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
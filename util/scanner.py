@@ -0,0 +1,184 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from iconsdk.exception import JSONRPCException
+
+from util import die, emit, in_icx, is_text_output
+from util.checks import address_list_type
+from util.txhandler import TxHandler
+
+
+class TxFilter(object):
+
+    def __init__(self, addresses=None, scores=None, methods=None):
+        self._addresses = set(addresses) if addresses else None
+        self._scores = set(scores) if scores else None
+        self._methods = set(methods) if methods else None
+
+    @staticmethod
+    def method(tx):
+        data = tx.get('data')
+        if tx.get('dataType') == 'call' and isinstance(data, dict):
+            return data.get('method')
+        return None
+
+    def match(self, tx):
+        if tx.get('dataType') == 'base':
+            return False
+        if self._addresses is not None and tx.get('from') not in self._addresses \
+                and tx.get('to') not in self._addresses:
+            return False
+        if self._scores is not None and tx.get('to') not in self._scores:
+            return False
+        if self._methods is not None and self.method(tx) not in self._methods:
+            return False
+        return True
+
+
+class BlockScanner(object):
+    PREFETCH = 4
+    CHECKPOINT_INTERVAL = 100
+
+    def __init__(self, tx_handler: TxHandler, tx_filter=None, checkpoint=None, prefetch=PREFETCH):
+        self._tx_handler = tx_handler
+        self._filter = tx_filter if tx_filter else TxFilter()
+        self._checkpoint = checkpoint
+        self._prefetch = max(1, prefetch)
+
+    def load_checkpoint(self):
+        if self._checkpoint is None or not os.path.exists(self._checkpoint):
+            return None
+        with open(self._checkpoint, 'r') as f:
+            return int(f.read().strip())
+
+    def save_checkpoint(self, height):
+        if self._checkpoint is None:
+            return
+        tmp_path = self._checkpoint + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(f'{height}\n')
+        os.replace(tmp_path, self._checkpoint)
+
+    def _get_range(self, start, end):
+        if start is None:
+            last = self.load_checkpoint()
+            if last is None:
+                die('Error: start height or checkpoint file should be specified')
+            start = last + 1
+        if end is None:
+            end = self._tx_handler.get_last_height()
+        return start, end
+
+    def blocks(self, start=None, end=None):
+        # keep some chunks in flight while delivering the blocks in order,
+        # the checkpoint is the last block the consumer has finished with
+        start, end = self._get_range(start, end)
+        heights = iter(range(start, end + 1))
+        pending = deque()
+        last = None
+        with ThreadPoolExecutor(self._prefetch) as executor:
+            def _submit():
+                chunk = list(islice(heights, TxHandler.BATCH_LIMIT))
+                if len(chunk) > 0:
+                    requests = [TxHandler.block_request(h) for h in chunk]
+                    pending.append((chunk, executor.submit(self._tx_handler.batch, requests)))
+
+            for _ in range(self._prefetch):
+                _submit()
+            try:
+                while len(pending) > 0:
+                    chunk, future = pending.popleft()
+                    results = future.result()
+                    _submit()
+                    for height, block in zip(chunk, results):
+                        if isinstance(block, JSONRPCException):
+                            raise block
+                        yield height, block
+                        last = height
+                        if height % self.CHECKPOINT_INTERVAL == 0:
+                            self.save_checkpoint(height)
+            finally:
+                for _, future in pending:
+                    future.cancel()
+                if last is not None:
+                    self.save_checkpoint(last)
+
+    def transactions(self, start=None, end=None):
+        for height, block in self.blocks(start, end):
+            for tx in block.get('confirmed_transaction_list', []):
+                if self._filter.match(tx):
+                    yield height, block, tx
+
+
+def add_parser(cmd, subparsers):
+    scan_parser = subparsers.add_parser('scan', help='Scan blocks and transactions')
+    scan_parser.add_argument('--start', type=int, metavar='HEIGHT',
+                             help='start height (default: next to the checkpoint)')
+    scan_parser.add_argument('--end', type=int, metavar='HEIGHT', help='end height (default: the last block)')
+    scan_parser.add_argument('--address', type=address_list_type, metavar='ADDRESSES',
+                             help='comma-separated addresses sending or receiving the transactions')
+    scan_parser.add_argument('--score', type=address_list_type, metavar='ADDRESSES',
+                             help='comma-separated SCORE addresses called by the transactions')
+    scan_parser.add_argument('--method', type=str, metavar='NAMES',
+                             help='comma-separated method names called by the transactions')
+    scan_parser.add_argument('--checkpoint', type=str, metavar='FILE',
+                             help='file to keep the last scanned height for resuming')
+    scan_parser.add_argument('--index', type=str, metavar='FILE',
+                             help='extract the staking, delegation and transfer events into the index file')
+    scan_parser.add_argument('--prefetch', type=int, default=BlockScanner.PREFETCH,
+                             help=f'number of block batches fetched ahead (default: {BlockScanner.PREFETCH})')
+
+    # register method
+    setattr(cmd, 'scan', run)
+
+
+def run(args):
+    methods = args.method.split(',') if args.method else None
+    if args.index:
+        from util.indexer import EventIndex, EventIndexer
+        index = EventIndex(args.index)
+        indexer = EventIndexer(args.txhandler, index, TxFilter(args.address, args.score, methods), args.prefetch)
+        count = indexer.run(args.start, args.end)
+        if is_text_output():
+            print(f'>>> Indexed events: {count} (total: {len(index)}, last height: {index.last_height})')
+        return
+    scanner = BlockScanner(args.txhandler, TxFilter(args.address, args.score, methods),
+                           args.checkpoint, args.prefetch)
+    count = 0
+    for height, block, tx in scanner.transactions(args.start, args.end):
+        count += 1
+        tx_hash = tx.get('txHash', tx.get('tx_hash'))
+        method = TxFilter.method(tx)
+        value = int(tx.get('value', '0x0'), 16)
+        if is_text_output():
+            print(f"{height}: {tx_hash} {tx.get('from')} -> {tx.get('to')} "
+                  f"{method if method else tx.get('dataType', 'transfer')} {in_icx(value)} ICX")
+        else:
+            emit('tx', {
+                'height': height,
+                'txHash': tx_hash,
+                'timestamp': tx.get('timestamp'),
+                'from': tx.get('from'),
+                'to': tx.get('to'),
+                'value': value,
+                'dataType': tx.get('dataType'),
+                'method': method,
+            })
+    if is_text_output():
+        print(f'>>> Matched transactions: {count}')
@@ -0,0 +1,259 @@
+# Copyright 2026 ICON Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import hashlib
+import hmac
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from iconsdk.exception import IconServiceBaseException
+
+from util import CommandExit, die, get_password, set_interactive, use_output
+from util.command import CommandArgs, create_parser
+from util.keystore import Keystore
+from util.metrics import prometheus_text
+from util.output import Output
+from util.provider import SessionProvider
+
+
+# the usage errors are returned to the client instead of the server's stderr
+class CommandParser(argparse.ArgumentParser):
+
+    def error(self, message):
+        raise CommandExit(f'{self.prog}: error: {message}')
+
+
+class CommandServer(object):
+    # command -> the options printing secrets, never served
+    SECRET_OPTIONS = {
+        'icx': ['private'],
+    }
+
+    def __init__(self, endpoint):
+        self._endpoint = endpoint
+        self._lock = threading.Lock()
+        self._handlers = {}
+        self._sessions = {}
+        self._secret = os.urandom(32)
+        self._parsers = {}
+        self._base_parser = self._create_parser()
+
+    def _create_parser(self, command=None):
+        parser = create_parser(self, command, CommandParser)
+        parser.set_defaults(endpoint=self._endpoint)
+        return parser
+
+    @staticmethod
+    def has_own_handler(args):
+        # the requests with these options get a handler of their own, closed with the request
+        workers = getattr(args, 'workers', None)
+        return (args.cache or args.record or args.replay or args.stats or
+                (workers and workers > SessionProvider.POOL_SIZE))
+
+    def get_txhandler(self, args):
+        with self._lock:
+            handler = self._handlers.get(args.endpoint)
+            if handler is None:
+                handler = args.create_txhandler()
+                self._handlers[args.endpoint] = handler
+            return handler
+
+    def close(self):
+        with self._lock:
+            for handler in self._handlers.values():
+                handler.close()
+            self._handlers.clear()
+
+    def _digest(self, password):
+        return hmac.new(self._secret, password.encode(), hashlib.sha256).digest()
+
+    def get_keystore(self, keystore_file, password):
+        # the unlocked wallet is shared only with the requests giving the same password
+        if keystore_file is not None:
+            keystore_file.close()
+        if keystore_file is None or password is None:
+            return Keystore(keystore_file, None)
+        with self._lock:
+            session = self._sessions.get(keystore_file.name)
+        if session is not None and hmac.compare_digest(session[0], self._digest(password)):
+            return session[1]
+        return Keystore(keystore_file, password)
+
+    def keep_session(self, keystore, password):
+        if password is None or keystore.path is None or not keystore.unlocked:
+            return
+        with self._lock:
+            self._sessions[keystore.path] = (self._digest(password), keystore)
+
+    def metrics(self):
+        with self._lock:
+            handlers = dict(self._handlers)
+        return prometheus_text(handlers)
+
+    def unlock(self, keystore_file, password):
+        if password is None:
+            password = get_password()
+        keystore = self.get_keystore(keystore_file, password)
+        keystore.get_wallet()
+        self.keep_session(keystore, password)
+
+    def parse(self, argv):
+        args, _ = self._base_parser.parse_known_args(argv)
+        if args.command == 'serve':
+            die('Error: serve command is not allowed')
+        with self._lock:
+            parser = self._parsers.get(args.command)
+            if parser is None:
+                parser = self._create_parser(args.command)
+                self._parsers[args.command] = parser
+        args = parser.parse_args(argv, namespace=CommandArgs())
+        for option in self.SECRET_OPTIONS.get(args.command, []):
+            if getattr(args, option, False):
+                die(f'Error: {args.command} --{option} is not allowed in serve mode')
+        return args
+
+    def execute(self, argv):
+        output = Output('json')
+        error = None
+        with use_output(output):
+            try:
+                args = self.parse(argv)
+                if not self.has_own_handler(args):
+                    args.txhandler = self.get_txhandler(args)
+                args.keystore = self.get_keystore(args.keystore_file, args.password)
+                try:
+                    getattr(self, args.command)(args)
+                finally:
+                    args.close()
+                    self.keep_session(args.keystore, args.password)
+            except CommandExit as e:
+                error = e.message
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    error = f'Error: exit status {e.code}'
+            except EOFError:
+                error = 'Error: interactive input is not supported'
+            except (Exception, IconServiceBaseException) as e:
+                error = f'Error: {e}'
+        result = {'records': output.records}
+        if error is not None:
+            result['error'] = error
+        return result
+
+
+class CommandRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # the headers and the body are written separately, don't hold the body for the ack
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._reply(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self._send(200, 'text/plain; version=0.0.4', self.server.commands.metrics().encode())
+        else:
+            self._reply(404, {'error': 'Error: not found'})
+
+    def do_POST(self):
+        if self.path != '/run':
+            self._reply(404, {'error': 'Error: not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            argv = json.loads(self.rfile.read(length))['args']
+            if not isinstance(argv, list) or not all(isinstance(v, str) for v in argv):
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, {'error': 'Error: request should be {"args": [...]}'})
+            return
+        result = self.server.commands.execute(argv)
+        self._reply(400 if 'error' in result else 200, result)
+
+    def _reply(self, code, body):
+        self._send(code, 'application/json', json.dumps(body).encode())
+
+    def _send(self, code, content_type, content):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def address_string(self):
+        # the client address is empty for the unix socket
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_request(self, code='-', size='-'):
+        if isinstance(code, int) and code >= 400:
+            super().log_request(code, size)
+
+
+class CommandHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, commands):
+        super().__init__(address, CommandRequestHandler)
+        self.commands = commands
+
+
+class CommandUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, commands):
+        if os.path.exists(path):
+            os.remove(path)
+        super().__init__(path, CommandRequestHandler)
+        self.commands = commands
+
+
+def add_parser(cmd, subparsers):
+    serve_parser = subparsers.add_parser('serve', help='Serve commands over a local JSON API')
+    serve_parser.add_argument('--host', type=str, default='127.0.0.1', help='address to listen on')
+    serve_parser.add_argument('--port', type=int, default=8080, help='port to listen on')
+    serve_parser.add_argument('--socket', type=str, metavar='PATH', help='listen on the unix socket instead')
+
+    # register method
+    setattr(cmd, 'serve', run)
+
+
+def run(args):
+    commands = CommandServer(args.endpoint)
+    # warm up the default endpoint and unlock the given keystore before detaching stdin,
+    # the requests should still give the password to use it
+    if not commands.has_own_handler(args):
+        commands.get_txhandler(args)
+    if args.keystore_file:
+        commands.unlock(args.keystore_file, args.password)
+    set_interactive(False)
+    sys.stdin = io.StringIO()
+    sys.stdout = sys.stderr
+    if args.socket:
+        server = CommandUnixServer(args.socket, commands)
+        print(f'Serving on {args.socket}')
+    else:
+        server = CommandHTTPServer((args.host, args.port), commands)
+        print(f'Serving on http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        commands.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
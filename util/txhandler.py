@@ -18,17 +18,28 @@ from iconsdk.builder.call_builder import CallBuilder
 from iconsdk.builder.transaction_builder import (
     CallTransactionBuilder, DeployTransactionBuilder, TransactionBuilder
 )
+from iconsdk.exception import JSONRPCException
 from iconsdk.signed_transaction import SignedTransaction
+from iconsdk.utils.converter import convert
+from iconsdk.utils.templates import TRANSACTION_RESULT
 
-from . import die, print_response, get_tracker_prefix
+from . import die, parallel_map, print_response, get_tracker_prefix
+from .cache import ImmutableCache
 
 
 class TxHandler:
     SYSTEM_ADDRESS = "cx0000000000000000000000000000000000000000"
+    BATCH_LIMIT = 10
+    MAX_WORKERS = 8
 
-    def __init__(self, service, nid):
+    def __init__(self, service, nid, provider):
         self._icon_service = service
         self._nid = nid
+        self._provider = provider
+        self._cache = ImmutableCache()
+
+    def close(self):
+        self._provider.close()
 
     @property
     def icon_service(self):
@@ -38,6 +49,24 @@ class TxHandler:
     def nid(self):
         return self._nid
 
+    @property
+    def metrics(self):
+        # the requests by the JSON-RPC method, recorded by the provider
+        return self._provider.metrics
+
+    @property
+    def retries(self):
+        # the retried calls by the error class
+        return self._provider.policy.retries
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @cache.setter
+    def cache(self, value):
+        self._cache = value
+
     def _send_transaction(self, transaction, wallet, limit):
         if limit is not None:
             signed_tx = SignedTransaction(transaction, wallet, limit)
@@ -64,14 +93,74 @@ class TxHandler:
     def update(self, wallet, to, content, params=None, limit=None):
         return self._deploy(wallet, to, content, params, limit)
 
-    def call(self, to, method, params=None, height=None):
-        _call = CallBuilder() \
+    @staticmethod
+    def _build_call(to, method, params=None, height=None):
+        return CallBuilder() \
             .to(to) \
             .method(method) \
             .params(params) \
             .height(height) \
             .build()
-        return self._icon_service.call(_call)
+
+    def call(self, to, method, params=None, height=None):
+        return self._icon_service.call(self._build_call(to, method, params, height))
+
+    def batch(self, requests):
+        # requests: a list of (method, params) for the read-only icx_* APIs,
+        # returns the results in the same order with an exception for the failed ones
+        if len(requests) == 0:
+            return []
+        chunks = [requests[i:i + self.BATCH_LIMIT] for i in range(0, len(requests), self.BATCH_LIMIT)]
+        results = parallel_map(self._provider.make_batch_request, chunks, self.MAX_WORKERS)
+        return [result for chunk in results for result in chunk]
+
+    def batch_cached(self, requests):
+        # the results should never change (pinned to a height or finalized),
+        # only the ones not in the cache are sent
+        # the nid is shared by the local networks, so the node is a part of the key
+        keys = [self._cache.key(self._provider.url, self._nid, method, params) for method, params in requests]
+        results = [self._cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(missing, self.batch([requests[i] for i in missing])):
+            results[i] = result
+            if not isinstance(result, JSONRPCException):
+                self._cache.put(keys[i], result)
+        return results
+
+    @staticmethod
+    def call_request(to, method, params=None, height=None):
+        _call = TxHandler._build_call(to, method, params, height)
+        rpc_params = {
+            "to": _call.to,
+            "dataType": "call",
+            "data": {
+                "method": _call.method
+            }
+        }
+        if isinstance(_call.params, dict):
+            rpc_params["data"]["params"] = _call.params
+        if _call.height is not None:
+            rpc_params["height"] = _call.height
+        return 'icx_call', rpc_params
+
+    @staticmethod
+    def balance_request(address, height=None):
+        params = {"address": address}
+        if height is not None:
+            params["height"] = hex(height)
+        return 'icx_getBalance', params
+
+    @staticmethod
+    def block_request(height):
+        return 'icx_getBlockByHeight', {"height": hex(height)}
+
+    def call_many(self, calls):
+        # calls: a list of (to, method, params, height)
+        return self.batch([self.call_request(*c) for c in calls])
+
+    def get_balances(self, addresses, height=None):
+        results = self.batch([self.balance_request(address, height) for address in addresses])
+        return [r if isinstance(r, JSONRPCException) else int(r, 16) for r in results]
 
     def invoke(self, wallet, to, method, params, value=0, limit=None):
         transaction = CallTransactionBuilder() \
@@ -99,17 +188,36 @@ class TxHandler:
     def total_supply(self, height=None):
         return self._icon_service.get_total_supply(height)
 
+    def get_block(self, height):
+        return self._provider.make_request(*self.block_request(height))
+
+    def get_last_height(self):
+        return self._provider.make_request('icx_getLastBlock')['height']
+
     def get_network_info(self):
         return self._icon_service.get_network_info()
 
     def get_score_status(self, address, height=None):
         return self._icon_service.get_score_status(address, height)
 
+    def get_tx_results(self, tx_hashes):
+        # the results of the finalized transactions are kept in the cache, the pending ones are returned as errors
+        return self.batch_cached([('icx_getTransactionResult', {"txHash": h}) for h in tx_hashes])
+
+    def get_txs_by_hash(self, tx_hashes):
+        return self.batch_cached([('icx_getTransactionByHash', {"txHash": h}) for h in tx_hashes])
+
     def get_tx_result(self, tx_hash):
-        return self._icon_service.get_transaction_result(tx_hash)
+        result = self.get_tx_results([tx_hash])[0]
+        if isinstance(result, JSONRPCException):
+            raise result
+        return convert(result, TRANSACTION_RESULT)
 
     def get_tx_by_hash(self, tx_hash):
-        return self._icon_service.get_transaction(tx_hash, True)
+        result = self.get_txs_by_hash([tx_hash])[0]
+        if isinstance(result, JSONRPCException):
+            return {'error': {'code': result.rpc_code, 'message': result.message}}
+        return {'result': result}
 
     def ensure_tx_result(self, tx_hash, verbose=False):
         if verbose:
@@ -135,3 +243,29 @@ class TxHandler:
             else:
                 print_response("Response", result)
                 die(f'Error: unknown response')
+
+    def ensure_tx_results(self, tx_hashes):
+        # polls the pending ones in batches, giving up after a few rounds without any progress
+        results = dict((h, None) for h in tx_hashes)
+        count = 5
+        while True:
+            pending = [h for h, r in results.items() if r is None]
+            if len(pending) == 0:
+                break
+            done = 0
+            for tx_hash, result in zip(pending, self.get_tx_results(pending)):
+                if not isinstance(result, JSONRPCException):
+                    results[tx_hash] = result
+                    done += 1
+            if done == 0:
+                count -= 1
+                if count <= 0:
+                    die(f'Error: failed to get {len(pending)} transaction results')
+            if done < len(pending):
+                sleep(2)
+        failed = [h for h, r in results.items() if r['status'] != '0x1']
+        if failed:
+            for tx_hash in failed:
+                print_response(tx_hash, results[tx_hash].get('failure'))
+            die(f'Error: {len(failed)} transactions failed')
+        return [results[h] for h in tx_hashes]